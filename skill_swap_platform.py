@@ -6,16 +6,33 @@ swap requests, and admin functionality. Includes comprehensive technical skills
 """
 
 import datetime
-from typing import List, Dict, Optional, Tuple
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from contextlib import ExitStack, contextmanager
+from typing import Any, Callable, Iterator, List, Dict, NamedTuple, Optional, Tuple
 from enum import Enum
+import itertools
+import json
+import math
+import re
+import threading
+import time
 import uuid
 import random
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for the columnar analytics table
+    np = None
+
 
 class RequestStatus(Enum):
     PENDING = "Pending"
     ACCEPTED = "Accepted"
     REJECTED = "Rejected"
+    EXPIRED = "Expired"
+    CANCELLED = "Cancelled"
 
 
 class TechnicalSkills:
@@ -205,11 +222,112 @@ class TechnicalSkills:
 
 
 class Feedback:
-    def __init__(self, from_user: str, rating: int, comment: str):
+    def __init__(self, from_user: str, rating: int, comment: str,
+                 timestamp: Optional[datetime.datetime] = None):
         self.from_user = from_user
         self.rating = rating  # 1-5 stars
         self.comment = comment
-        self.timestamp = datetime.datetime.now()
+        self.timestamp = timestamp or datetime.datetime.now()
+
+
+class FeedbackStore:
+    """Append-only columnar store of feedback, indexed by target and reviewer.
+
+    Each review is a row across parallel arrays; emails are interned to small
+    integers. Row ids grow with insertion time, so the per-target and
+    per-reviewer row lists are already time ordered and keyset paging is a
+    bisect on row id. Rating sums are kept per target so averages are O(1).
+    """
+
+    def __init__(self):
+        self.targets = array("I")
+        self.reviewers = array("I")
+        self.ratings = array("b")
+        self.timestamps = array("d")  # POSIX seconds
+        self.comments: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._emails: List[str] = []
+        self._rows_by_target: Dict[int, array] = {}
+        self._rows_by_reviewer: Dict[int, array] = {}
+        self._rating_sums: Dict[int, int] = {}
+
+    def _intern(self, email: str) -> int:
+        if email not in self._ids:
+            self._ids[email] = len(self._emails)
+            self._emails.append(email)
+        return self._ids[email]
+
+    def append(self, target: str, reviewer: str, rating: int, comment: str,
+               timestamp: Optional[datetime.datetime] = None) -> int:
+        """Store a review and return its row id"""
+        target_id = self._intern(target)
+        reviewer_id = self._intern(reviewer)
+        row = len(self.comments)
+        self.targets.append(target_id)
+        self.reviewers.append(reviewer_id)
+        self.ratings.append(rating)
+        self.timestamps.append((timestamp or datetime.datetime.now()).timestamp())
+        self.comments.append(comment)
+        self._rows_by_target.setdefault(target_id, array("I")).append(row)
+        self._rows_by_reviewer.setdefault(reviewer_id, array("I")).append(row)
+        self._rating_sums[target_id] = self._rating_sums.get(target_id, 0) + rating
+        return row
+
+    def email_for(self, interned_id: int) -> str:
+        """Email for an interned id from the targets or reviewers column"""
+        return self._emails[interned_id]
+
+    def row(self, row: int) -> Feedback:
+        """Materialise one stored row as a Feedback object"""
+        return Feedback(
+            self._emails[self.reviewers[row]], self.ratings[row], self.comments[row],
+            datetime.datetime.fromtimestamp(self.timestamps[row])
+        )
+
+    def _target_rows(self, target: str) -> array:
+        target_id = self._ids.get(target)
+        return self._rows_by_target.get(target_id, array("I"))
+
+    def count(self, target: Optional[str] = None) -> int:
+        """Number of reviews for a target, or in total"""
+        if target is None:
+            return len(self.comments)
+        return len(self._target_rows(target))
+
+    def average_rating(self, target: str) -> float:
+        """Mean rating received by a target"""
+        count = self.count(target)
+        if not count:
+            return 0.0
+        return self._rating_sums[self._ids[target]] / count
+
+    def for_target(self, target: str) -> List[Feedback]:
+        """All reviews for a target, oldest first"""
+        return [self.row(row) for row in self._target_rows(target)]
+
+    def latest(self, target: str, limit: int) -> List[Feedback]:
+        """The most recent reviews for a target, oldest first"""
+        rows = self._target_rows(target)
+        return [self.row(row) for row in rows[max(len(rows) - limit, 0):]]
+
+    def page(self, target: str, before: Optional[int] = None,
+             limit: int = 10) -> Tuple[List[Feedback], Optional[int]]:
+        """Keyset-paged reviews for a target, newest first.
+
+        Pass the returned cursor as ``before`` to fetch the next page; the
+        cursor is None once there are no older reviews.
+        """
+        rows = self._target_rows(target)
+        end = len(rows) if before is None else bisect_left(rows, before)
+        start = max(end - limit, 0)
+        page = [self.row(row) for row in reversed(rows[start:end])]
+        return page, (rows[start] if start > 0 else None)
+
+    def by_reviewer(self, reviewer: str) -> List[Tuple[str, Feedback]]:
+        """(target, feedback) pairs for every review a user has written"""
+        reviewer_id = self._ids.get(reviewer)
+        return [(self._emails[self.targets[row]], self.row(row))
+                for row in self._rows_by_reviewer.get(reviewer_id, ())]
 
 
 class User:
@@ -223,27 +341,87 @@ class User:
         self.skills_offered: List[str] = []
         self.skills_wanted: List[str] = []
         self.availability: str = ""
+        self.timezone: str = "IST"
         self.is_public: bool = True
-        self.feedback: List[Feedback] = []
+        # The platform's shared store; a private one is created only if reviews arrive first
+        self.feedback_store: Optional[FeedbackStore] = None
         self.is_banned: bool = False
         self.created_at = datetime.datetime.now()
+        self.version = 0  # Bumped on every change so derived data can detect staleness
+        self._change_listeners: List = []
+        # Copies of list fields as last reported, so in-place edits still register as changes
+        self._reported_lists: Dict[str, Tuple] = {}
+
+    def add_change_listener(self, listener):
+        """Register a callable invoked as listener(user, changes) after each change"""
+        self._change_listeners.append(listener)
+        self._remember_lists()
+
+    def _remember_lists(self):
+        for key, value in vars(self).items():
+            if isinstance(value, list) and not key.startswith("_"):
+                self._reported_lists[key] = tuple(value)
+
+    def _notify_change(self, changes: Dict[str, Tuple[Any, Any]]):
+        self.version += 1
+        self._remember_lists()
+        for listener in self._change_listeners:
+            listener(self, changes)
 
     def add_feedback(self, from_user: str, rating: int, comment: str):
         """Add feedback from another user"""
-        feedback = Feedback(from_user, rating, comment)
-        self.feedback.append(feedback)
+        if not 1 <= rating <= 5:
+            raise ValueError(f"Rating must be between 1 and 5, got {rating!r}")
+        if self.feedback_store is None:
+            self.feedback_store = FeedbackStore()
+        self.feedback_store.append(self.email, from_user, rating, comment)
+        count = self.get_feedback_count()
+        self._notify_change({"feedback": (count - 1, count)})
+
+    def attach_feedback_store(self, store: FeedbackStore):
+        """Move this user's reviews into a shared store"""
+        if store is self.feedback_store:
+            return
+        if self.feedback_store is None:
+            self.feedback_store = store
+            return
+        for feedback in self.feedback_store.for_target(self.email):
+            store.append(self.email, feedback.from_user, feedback.rating,
+                         feedback.comment, feedback.timestamp)
+        self.feedback_store = store
+
+    @property
+    def feedback(self) -> Tuple[Feedback, ...]:
+        """All feedback received, oldest first"""
+        if self.feedback_store is None:
+            return ()
+        return tuple(self.feedback_store.for_target(self.email))
+
+    def get_feedback_count(self) -> int:
+        """Number of reviews received"""
+        if self.feedback_store is None:
+            return 0
+        return self.feedback_store.count(self.email)
 
     def get_average_rating(self) -> float:
         """Calculate average rating from all feedback"""
-        if not self.feedback:
+        if self.feedback_store is None:
             return 0.0
-        return sum(f.rating for f in self.feedback) / len(self.feedback)
+        return self.feedback_store.average_rating(self.email)
 
     def update_profile(self, **kwargs):
         """Update user profile with provided fields"""
+        changes = {}
         for key, value in kwargs.items():
             if hasattr(self, key):
+                old_value = getattr(self, key)
+                if isinstance(old_value, list):
+                    old_value = list(self._reported_lists.get(key, ()))
                 setattr(self, key, value)
+                if old_value != value:
+                    changes[key] = (old_value, value)
+        if changes:
+            self._notify_change(changes)
 
     def __str__(self):
         rating = self.get_average_rating()
@@ -268,26 +446,1633 @@ class SwapRequest:
         self.status = RequestStatus.PENDING
         self.created_at = datetime.datetime.now()
         self.updated_at = datetime.datetime.now()
+        self.version = 0  # Bumped on every status change, for compare-and-swap updates
+        self._lock = threading.Lock()
+
+    # Only pending requests can change state; every other status is final
+    ALLOWED_TRANSITIONS = {
+        RequestStatus.PENDING: {RequestStatus.ACCEPTED, RequestStatus.REJECTED,
+                                RequestStatus.EXPIRED, RequestStatus.CANCELLED},
+    }
+
+    def can_transition(self, new_status: RequestStatus,
+                       expected_version: Optional[int] = None) -> bool:
+        """Check a transition against the state machine and, if given, the expected version"""
+        if expected_version is not None and expected_version != self.version:
+            return False
+        return new_status in self.ALLOWED_TRANSITIONS.get(self.status, ())
 
-    def update_status(self, new_status: RequestStatus):
-        """Update the status of the swap request"""
+    def _apply_status(self, new_status: RequestStatus):
         self.status = new_status
+        self.version += 1
         self.updated_at = datetime.datetime.now()
 
+    def update_status(self, new_status: RequestStatus,
+                      expected_version: Optional[int] = None) -> bool:
+        """Atomically move to new_status if the transition is allowed and the version matches"""
+        with self._lock:
+            if not self.can_transition(new_status, expected_version):
+                return False
+            self._apply_status(new_status)
+            return True
+
     def __str__(self):
         return f"Request: {self.offered_skill} ↔ {self.requested_skill} - Status: {self.status.value}"
 
 
-class SkillSwapPlatform:
+class Event:
+    def __init__(self, sequence: int, event_type: str, payload: Dict[str, Any]):
+        self.sequence = sequence
+        self.event_type = event_type
+        self.payload = payload
+        self.timestamp = datetime.datetime.now()
+
+    def __str__(self):
+        return f"[{self.timestamp.strftime('%Y-%m-%d %H:%M')}] {self.event_type}: {self.payload}"
+
+
+class UserInbox:
+    """Bounded queue of events addressed to a single user"""
+
+    def __init__(self, max_size: int):
+        self.events: deque = deque()
+        self.max_size = max_size
+        self.dropped = 0
+        self.is_active = False
+        self.broadcast_cursor = 0  # Sequence of the last broadcast this inbox has seen
+        self.broadcasts_seen = 0  # Ordinal of that broadcast, used to count ones lost to the ring
+
+
+class EventBus:
+    """Publish/subscribe bus with per-user bounded inboxes.
+
+    Direct events are queued in the recipient's inbox. Broadcasts are stored
+    once in a shared log and each active inbox keeps a cursor into it, so an
+    announcement costs O(1) to publish regardless of how many sessions are open.
+    When an inbox is full the oldest event is dropped and counted, so a slow
+    client can never make publishers block or grow memory without bound.
+    Broadcasts that fall off the shared log before an active session reads
+    them are counted in that inbox's ``dropped`` total as well.
+    """
+
+    def __init__(self, inbox_size: int = 100, broadcast_history: int = 200):
+        self.inbox_size = inbox_size
+        self.inboxes: Dict[str, UserInbox] = {}
+        self.broadcasts: deque = deque(maxlen=broadcast_history)
+        self._sequence = itertools.count(1)
+        self._last_sequence = 0
+        self._broadcast_total = 0
+        self._condition = threading.Condition()
+
+    def _next_sequence(self) -> int:
+        self._last_sequence = next(self._sequence)
+        return self._last_sequence
+
+    def _get_inbox(self, user_id: str) -> UserInbox:
+        inbox = self.inboxes.get(user_id)
+        if inbox is None:
+            inbox = UserInbox(self.inbox_size)
+            inbox.broadcast_cursor = self._last_sequence
+            inbox.broadcasts_seen = self._broadcast_total
+            self.inboxes[user_id] = inbox
+        return inbox
+
+    def _enqueue(self, inbox: UserInbox, event: Event) -> bool:
+        delivered_cleanly = True
+        if len(inbox.events) >= inbox.max_size:
+            inbox.events.popleft()
+            inbox.dropped += 1
+            delivered_cleanly = False
+        inbox.events.append(event)
+        return delivered_cleanly
+
+    def subscribe(self, user_id: str):
+        """Mark a user's session as active so it starts receiving broadcasts"""
+        with self._condition:
+            inbox = self._get_inbox(user_id)
+            if not inbox.is_active:
+                inbox.is_active = True
+                inbox.broadcast_cursor = self._last_sequence
+                inbox.broadcasts_seen = self._broadcast_total
+
+    def unsubscribe(self, user_id: str):
+        """Stop delivering broadcasts to a user; direct events are still queued"""
+        with self._condition:
+            if user_id in self.inboxes:
+                self.inboxes[user_id].is_active = False
+
+    def publish(self, user_id: str, event_type: str, payload: Dict[str, Any]) -> bool:
+        """Queue an event for one user. Returns False if an older event was dropped."""
+        with self._condition:
+            event = Event(self._next_sequence(), event_type, payload)
+            delivered_cleanly = self._enqueue(self._get_inbox(user_id), event)
+            self._condition.notify_all()
+        return delivered_cleanly
+
+    def publish_many(self, events: List[Tuple[str, str, Dict[str, Any]]]) -> int:
+        """Queue a batch of (user_id, event_type, payload) events under one lock.
+
+        Returns the number of events that forced an older event out of an inbox.
+        """
+        dropped = 0
+        with self._condition:
+            for user_id, event_type, payload in events:
+                event = Event(self._next_sequence(), event_type, payload)
+                if not self._enqueue(self._get_inbox(user_id), event):
+                    dropped += 1
+            if events:
+                self._condition.notify_all()
+        return dropped
+
+    def broadcast(self, event_type: str, payload: Dict[str, Any]) -> Event:
+        """Publish an event to every active session"""
+        with self._condition:
+            event = Event(self._next_sequence(), event_type, payload)
+            self.broadcasts.append(event)
+            self._broadcast_total += 1
+            self._condition.notify_all()
+        return event
+
+    def _pending_broadcasts(self, inbox: UserInbox) -> List[Event]:
+        if not inbox.is_active:
+            return []
+        pending = []
+        for event in reversed(self.broadcasts):
+            if event.sequence <= inbox.broadcast_cursor:
+                break
+            pending.append(event)
+        pending.reverse()
+        return pending
+
+    def pending_count(self, user_id: str) -> int:
+        """Number of events waiting for a user"""
+        with self._condition:
+            inbox = self.inboxes.get(user_id)
+            if inbox is None:
+                return 0
+            return len(inbox.events) + len(self._pending_broadcasts(inbox))
+
+    def _count_evicted_broadcasts(self, inbox: UserInbox):
+        if not inbox.is_active:
+            return
+        oldest_retained = self._broadcast_total - len(self.broadcasts) + 1
+        missed = oldest_retained - 1 - inbox.broadcasts_seen
+        if missed > 0:
+            inbox.dropped += missed
+            inbox.broadcasts_seen += missed
+
+    def _drain(self, inbox: UserInbox, max_events: int) -> List[Event]:
+        self._count_evicted_broadcasts(inbox)
+        broadcasts = self._pending_broadcasts(inbox)
+        batch: List[Event] = []
+        b = 0
+        while len(batch) < max_events and (inbox.events or b < len(broadcasts)):
+            take_direct = inbox.events and (
+                b >= len(broadcasts) or inbox.events[0].sequence < broadcasts[b].sequence
+            )
+            if take_direct:
+                batch.append(inbox.events.popleft())
+            else:
+                batch.append(broadcasts[b])
+                inbox.broadcast_cursor = broadcasts[b].sequence
+                inbox.broadcasts_seen += 1
+                b += 1
+        return batch
+
+    def poll(self, user_id: str, max_events: int = 50) -> List[Event]:
+        """Return up to max_events pending events for a user, oldest first"""
+        with self._condition:
+            inbox = self.inboxes.get(user_id)
+            if inbox is None:
+                return []
+            return self._drain(inbox, max_events)
+
+    def wait_for_events(self, user_id: str, timeout: float = 30.0,
+                        max_events: int = 50) -> List[Event]:
+        """Long-poll: block until events are available or the timeout expires"""
+        with self._condition:
+            inbox = self._get_inbox(user_id)
+            self._condition.wait_for(
+                lambda: inbox.events or self._pending_broadcasts(inbox), timeout
+            )
+            return self._drain(inbox, max_events)
+
+
+class AvailabilitySchedule:
+    """Weekly availability as a bitmap of half-hour slots in UTC.
+
+    Bit ``day * 48 + half_hour`` is set when the user is free in that slot,
+    with Monday 00:00 UTC as slot 0. Free-text availability such as
+    "Weekends, Evenings", "Mon-Fri after 6pm" or "Tuesday 7-9pm PST" is parsed
+    by collecting the days and time ranges mentioned in each ";"-separated
+    clause and taking their cross product. Hours without am/pm are read the
+    way people write them: "9-5" is 9am-5pm, and in a clause naming an
+    afternoon, evening or night period they are pm. Clauses containing a time
+    the parser can't read are skipped rather than treated as the whole day.
+    """
+
+    SLOTS_PER_DAY = 48
+    SLOTS_PER_WEEK = 7 * SLOTS_PER_DAY
+    FULL_WEEK_MASK = (1 << SLOTS_PER_WEEK) - 1
+
+    TIMEZONE_OFFSETS = {  # Offset from UTC in minutes
+        "IST": 330, "UTC": 0, "GMT": 0, "BST": 60, "CET": 60, "CEST": 120,
+        "GST": 240, "PKT": 300, "NPT": 345, "SGT": 480, "JST": 540, "AEST": 600,
+        "EST": -300, "EDT": -240, "CST": -360, "CDT": -300, "MST": -420,
+        "MDT": -360, "PST": -480, "PDT": -420,
+    }
+
+    DAY_NAMES = {
+        "mon": [0], "monday": [0], "mondays": [0],
+        "tue": [1], "tues": [1], "tuesday": [1], "tuesdays": [1],
+        "wed": [2], "wednesday": [2], "wednesdays": [2],
+        "thu": [3], "thur": [3], "thurs": [3], "thursday": [3], "thursdays": [3],
+        "fri": [4], "friday": [4], "fridays": [4],
+        "sat": [5], "saturday": [5], "saturdays": [5],
+        "sun": [6], "sunday": [6], "sundays": [6],
+        "weekday": [0, 1, 2, 3, 4], "weekdays": [0, 1, 2, 3, 4],
+        "weekend": [5, 6], "weekends": [5, 6],
+        "daily": list(range(7)), "everyday": list(range(7)),
+    }
+
+    PERIODS = {  # Local (start_hour, end_hour)
+        "morning": (6, 12), "mornings": (6, 12),
+        "afternoon": (12, 17), "afternoons": (12, 17),
+        "evening": (17, 21), "evenings": (17, 21),
+        "night": (21, 24), "nights": (21, 24),
+        "all day": (0, 24), "anytime": (0, 24),
+    }
+    PM_PERIODS = {"afternoon", "afternoons", "evening", "evenings", "night", "nights"}
+
+    _TIME_RANGE = re.compile(
+        r"(\d{1,2})(?::(\d{2}))?\s*(am|pm)?\s*(?:-|–|to)\s*(\d{1,2})(?::(\d{2}))?\s*(am|pm)?"
+    )
+    _TIME_BOUND = re.compile(
+        r"\b(after|from|since|before|until|till)\s+(\d{1,2})(?::(\d{2}))?\s*(am|pm)?"
+    )
+    _UTC_OFFSET = re.compile(r"\b(?:utc|gmt)\s*([+-])\s*(\d{1,2})(?::(\d{2}))?")
+    _WORD = re.compile(r"[a-z]+")
+    _SINGLE_DAY = "|".join(sorted((name for name, days in DAY_NAMES.items() if len(days) == 1),
+                                  key=len, reverse=True))
+    _DAY_RANGE = re.compile(
+        rf"\b({_SINGLE_DAY})\s*(?:-|–|to|through|thru)\s*({_SINGLE_DAY})\b"
+    )
+
+    def __init__(self, mask: int = 0):
+        self.mask = mask
+
+    @classmethod
+    def timezone_offset(cls, timezone: str) -> Optional[int]:
+        """Offset from UTC in minutes for a timezone abbreviation or UTC+hh:mm"""
+        timezone = timezone.strip()
+        if timezone.upper() in cls.TIMEZONE_OFFSETS:
+            return cls.TIMEZONE_OFFSETS[timezone.upper()]
+        match = cls._UTC_OFFSET.search(timezone.lower())
+        if match:
+            minutes = int(match.group(2)) * 60 + int(match.group(3) or 0)
+            return minutes if match.group(1) == "+" else -minutes
+        return None
+
+    @staticmethod
+    def _to_minutes(hour: str, minute: Optional[str], meridiem: Optional[str]) -> int:
+        hours = int(hour) % 24
+        if meridiem == "pm" and hours < 12:
+            hours += 12
+        elif meridiem == "am" and hours == 12:
+            hours = 0
+        return hours * 60 + int(minute or 0)
+
+    @staticmethod
+    def _meridiem(hour: str, meridiem: Optional[str], prefer_pm: bool) -> Optional[str]:
+        """Explicit am/pm, or pm for a bare 1-11 when the clause names a later period"""
+        if meridiem is None and prefer_pm and 1 <= int(hour) < 12:
+            return "pm"
+        return meridiem
+
+    @classmethod
+    def parse(cls, text: str, timezone: str = "IST") -> Optional["AvailabilitySchedule"]:
+        """Parse free-text availability; returns None if nothing is recognised"""
+        if not text:
+            return None
+        lowered = text.lower()
+        offset = cls.timezone_offset(timezone) or 0
+        for word in cls._WORD.findall(lowered):
+            if word.upper() in cls.TIMEZONE_OFFSETS:
+                offset = cls.TIMEZONE_OFFSETS[word.upper()]
+        utc_match = cls._UTC_OFFSET.search(lowered)
+        if utc_match:
+            offset = cls.timezone_offset(utc_match.group(0))
+
+        schedule = cls()
+        recognised = False
+        for clause in lowered.split(";"):
+            days = set()
+            ranges = []
+            clause = cls._UTC_OFFSET.sub(" ", clause)
+            prefer_pm = any(word in cls.PM_PERIODS for word in cls._WORD.findall(clause))
+            for match in cls._TIME_RANGE.finditer(clause):
+                start_meridiem = cls._meridiem(match.group(1), match.group(3), prefer_pm)
+                end_meridiem = cls._meridiem(match.group(4), match.group(6), prefer_pm)
+                end = cls._to_minutes(match.group(4), match.group(5), end_meridiem)
+                start = cls._to_minutes(match.group(1), match.group(2), start_meridiem)
+                if start_meridiem is None and end_meridiem:
+                    # "7-9pm" means 7pm, but "10-2pm" means 10am
+                    inherited = cls._to_minutes(match.group(1), match.group(2), end_meridiem)
+                    if inherited < end:
+                        start = inherited
+                if end <= start and match.group(6) is None and end + 12 * 60 > start:
+                    end += 12 * 60  # "9-5" means 9am-5pm, "evenings 6-12" runs to midnight
+                if end <= start:
+                    end += 24 * 60  # Range runs past midnight
+                ranges.append((start, end))
+            clause = cls._TIME_RANGE.sub(" ", clause)
+            for match in cls._TIME_BOUND.finditer(clause):
+                meridiem = cls._meridiem(match.group(2), match.group(4), prefer_pm)
+                bound = cls._to_minutes(match.group(2), match.group(3), meridiem)
+                if match.group(1) in ("after", "from", "since"):
+                    ranges.append((bound, 24 * 60))
+                else:
+                    ranges.append((0, bound))
+            clause = cls._TIME_BOUND.sub(" ", clause)
+            for match in cls._DAY_RANGE.finditer(clause):
+                first = cls.DAY_NAMES[match.group(1)][0]
+                last = cls.DAY_NAMES[match.group(2)][0]
+                days.update((first + i) % 7 for i in range((last - first) % 7 + 1))
+            clause_words = cls._DAY_RANGE.sub(" ", clause)
+            if any(char.isdigit() for char in clause_words):
+                continue  # A time we can't read; don't widen it to the whole day
+            explicit_times = bool(ranges)  # A named period then only sets am/pm
+            for word in cls._WORD.findall(clause_words):
+                days.update(cls.DAY_NAMES.get(word, []))
+                if word in cls.PERIODS and not explicit_times:
+                    start_hour, end_hour = cls.PERIODS[word]
+                    ranges.append((start_hour * 60, end_hour * 60))
+            if "all day" in clause_words and not explicit_times:
+                ranges.append((0, 24 * 60))
+            if not days and not ranges:
+                continue
+            recognised = True
+            for day in (days or range(7)):
+                for start, end in (ranges or [(0, 24 * 60)]):
+                    schedule.add_range(day, start, end, offset)
+        return schedule if recognised else None
+
+    def add_range(self, day: int, start_minute: int, end_minute: int, utc_offset: int = 0):
+        """Mark local [start, end) minutes on a weekday as free"""
+        first = (day * 24 * 60 + start_minute - utc_offset) // 30
+        last = -((-(day * 24 * 60 + end_minute - utc_offset)) // 30)  # Round up
+        for slot in range(first, last):
+            self.mask |= 1 << (slot % self.SLOTS_PER_WEEK)
+
+    def overlaps(self, other: "AvailabilitySchedule") -> bool:
+        """Check whether two schedules share any free slot"""
+        return bool(self.mask & other.mask)
+
+    def slots(self) -> List[int]:
+        """Indices of all free slots"""
+        return _set_bits(self.mask)
+
+
+def _set_bits(mask: int) -> List[int]:
+    """Positions of the set bits in an integer bitmap, lowest first"""
+    positions = []
+    while mask:
+        low_bit = mask & -mask
+        positions.append(low_bit.bit_length() - 1)
+        mask ^= low_bit
+    return positions
+
+
+class AvailabilityIndex:
+    """Per-slot bitmap index mapping each half-hour slot to the users free in it.
+
+    Users are assigned small integer ordinals; slot_bitmaps[slot] has bit n set
+    when user n is free in that slot, so an overlap query is an OR over the
+    query's slots followed by decoding the result bits.
+    """
+
+    def __init__(self):
+        self.slot_bitmaps: List[int] = [0] * AvailabilitySchedule.SLOTS_PER_WEEK
+        self.schedules: Dict[str, AvailabilitySchedule] = {}
+        self._ordinals: Dict[str, int] = {}
+        self._emails: List[str] = []
+
+    def _ordinal(self, email: str) -> int:
+        if email not in self._ordinals:
+            self._ordinals[email] = len(self._emails)
+            self._emails.append(email)
+        return self._ordinals[email]
+
+    def update(self, email: str, schedule: Optional[AvailabilitySchedule]):
+        """Replace a user's indexed schedule"""
+        user_bit = 1 << self._ordinal(email)
+        old_schedule = self.schedules.pop(email, None)
+        if old_schedule is not None:
+            for slot in old_schedule.slots():
+                self.slot_bitmaps[slot] &= ~user_bit
+        if schedule is not None:
+            self.schedules[email] = schedule
+            for slot in schedule.slots():
+                self.slot_bitmaps[slot] |= user_bit
+
+    def query(self, schedule: AvailabilitySchedule) -> List[str]:
+        """Emails of users whose availability overlaps the given schedule"""
+        matches = 0
+        for slot in schedule.slots():
+            matches |= self.slot_bitmaps[slot]
+        return [self._emails[ordinal] for ordinal in _set_bits(matches)]
+
+
+class SkillIndex:
+    """Inverted index from offered skill to the users offering it"""
+
+    def __init__(self):
+        self.users_by_skill: Dict[str, set] = {}  # lowercased skill -> emails
+        self._ordinals: Dict[str, int] = {}  # Registration order, for stable results
+
+    def update(self, email: str, old_skills: List[str], new_skills: List[str]):
+        """Move a user from their old skill postings to the new ones"""
+        self._ordinals.setdefault(email, len(self._ordinals))
+        for skill in old_skills:
+            emails = self.users_by_skill.get(skill.lower())
+            if emails is not None:
+                emails.discard(email)
+                if not emails:
+                    del self.users_by_skill[skill.lower()]
+        for skill in new_skills:
+            self.users_by_skill.setdefault(skill.lower(), set()).add(email)
+
+    def lookup(self, query: str) -> List[str]:
+        """Emails of users offering any skill containing query, in registration order"""
+        query = query.lower()
+        emails = set()
+        for skill, skill_emails in self.users_by_skill.items():
+            if query in skill:
+                emails.update(skill_emails)
+        return sorted(emails, key=self._ordinals.__getitem__)
+
+
+class Gazetteer:
+    """Offline lookup of city names to coordinates"""
+
+    CITIES = {  # Canonical name -> (latitude, longitude)
+        "Mumbai": (19.0760, 72.8777), "Delhi": (28.6139, 77.2090),
+        "Bengaluru": (12.9716, 77.5946), "Hyderabad": (17.3850, 78.4867),
+        "Chennai": (13.0827, 80.2707), "Kolkata": (22.5726, 88.3639),
+        "Pune": (18.5204, 73.8567), "Ahmedabad": (23.0225, 72.5714),
+        "Jaipur": (26.9124, 75.7873), "Surat": (21.1702, 72.8311),
+        "Lucknow": (26.8467, 80.9462), "Kanpur": (26.4499, 80.3319),
+        "Nagpur": (21.1458, 79.0882), "Indore": (22.7196, 75.8577),
+        "Bhopal": (23.2599, 77.4126), "Patna": (25.5941, 85.1376),
+        "Vadodara": (22.3072, 73.1812), "Ludhiana": (30.9010, 75.8573),
+        "Agra": (27.1767, 78.0081), "Nashik": (19.9975, 73.7898),
+        "Gurugram": (28.4595, 77.0266), "Noida": (28.5355, 77.3910),
+        "Faridabad": (28.4089, 77.3178), "Ghaziabad": (28.6692, 77.4538),
+        "Navi Mumbai": (19.0330, 73.0297), "Thane": (19.2183, 72.9781),
+        "Chandigarh": (30.7333, 76.7794), "Kochi": (9.9312, 76.2673),
+        "Thiruvananthapuram": (8.5241, 76.9366), "Coimbatore": (11.0168, 76.9558),
+        "Mysuru": (12.2958, 76.6394), "Mangaluru": (12.9141, 74.8560),
+        "Visakhapatnam": (17.6868, 83.2185), "Vijayawada": (16.5062, 80.6480),
+        "Bhubaneswar": (20.2961, 85.8245), "Guwahati": (26.1445, 91.7362),
+        "Dehradun": (30.3165, 78.0322), "Goa": (15.2993, 74.1240),
+        "Singapore": (1.3521, 103.8198), "Dubai": (25.2048, 55.2708),
+        "London": (51.5074, -0.1278), "New York": (40.7128, -74.0060),
+        "San Francisco": (37.7749, -122.4194), "Toronto": (43.6532, -79.3832),
+        "Sydney": (-33.8688, 151.2093), "Berlin": (52.5200, 13.4050),
+    }
+
+    ALIASES = {
+        "bombay": "Mumbai", "new delhi": "Delhi", "delhi ncr": "Delhi", "ncr": "Delhi",
+        "bangalore": "Bengaluru", "gurgaon": "Gurugram", "madras": "Chennai",
+        "calcutta": "Kolkata", "poona": "Pune", "cochin": "Kochi",
+        "trivandrum": "Thiruvananthapuram", "mysore": "Mysuru", "mangalore": "Mangaluru",
+        "vizag": "Visakhapatnam", "baroda": "Vadodara", "nyc": "New York", "sf": "San Francisco",
+    }
+
+    _LOOKUP = {**{name.lower(): name for name in CITIES}, **ALIASES}
+
+    @classmethod
+    def resolve(cls, location: Optional[str]) -> Optional[Tuple[str, float, float]]:
+        """Normalise a free-text location like "Bangalore, Karnataka" to (city, lat, lon)"""
+        if not location:
+            return None
+        candidates = [location] + location.split(",")
+        for candidate in candidates:
+            city = cls._LOOKUP.get(" ".join(candidate.lower().split()))
+            if city is not None:
+                latitude, longitude = cls.CITIES[city]
+                return city, latitude, longitude
+        return None
+
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class GeoIndex:
+    """Uniform lat/lon grid index for radius queries.
+
+    A query only visits the cells overlapping the bounding box of the search
+    circle, then checks exact distances for the users in those cells. Columns
+    wrap at the antimeridian, and when the box covers more cells than are
+    occupied the occupied cells are filtered instead.
+    """
+
+    def __init__(self, cell_degrees: float = 0.5):
+        self.cell_degrees = cell_degrees
+        self.columns = math.ceil(360 / cell_degrees)
+        self.cells: Dict[Tuple[int, int], set] = {}
+        self.coordinates: Dict[str, Tuple[float, float]] = {}
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return (math.floor(latitude / self.cell_degrees),
+                math.floor((longitude % 360) / self.cell_degrees))
+
+    def update(self, email: str, coordinates: Optional[Tuple[float, float]]):
+        """Move a user to the cell for their new coordinates, or drop them if None"""
+        old_coordinates = self.coordinates.pop(email, None)
+        if old_coordinates is not None:
+            cell = self._cell(*old_coordinates)
+            self.cells[cell].discard(email)
+            if not self.cells[cell]:
+                del self.cells[cell]
+        if coordinates is not None:
+            self.coordinates[email] = coordinates
+            self.cells.setdefault(self._cell(*coordinates), set()).add(email)
+
+    def query(self, latitude: float, longitude: float, radius_km: float) -> List[Tuple[str, float]]:
+        """(email, distance_km) pairs within radius, nearest first"""
+        angle = radius_km / EARTH_RADIUS_KM
+        lat_span = math.degrees(angle)
+        min_row = math.floor(max(latitude - lat_span, -90.0) / self.cell_degrees)
+        max_row = math.floor(min(latitude + lat_span, 90.0) / self.cell_degrees)
+
+        columns = None  # None means every column
+        if abs(latitude) + lat_span < 90.0 and angle < math.pi / 2:
+            # Widest longitude offset of a circle that doesn't contain a pole
+            lon_span = math.degrees(math.asin(min(math.sin(angle) / math.cos(math.radians(latitude)), 1.0)))
+            west = (longitude - lon_span) % 360
+            east = west + 2 * lon_span
+            columns = set(range(math.floor(west / self.cell_degrees),
+                                math.floor(min(east, 360.0) / self.cell_degrees) + 1))
+            if east >= 360.0:
+                columns.update(range(math.floor((east - 360.0) / self.cell_degrees) + 1))
+
+        box_cells = (max_row - min_row + 1) * (self.columns if columns is None else len(columns))
+        if box_cells > len(self.cells):
+            candidates = [cell for cell in self.cells if min_row <= cell[0] <= max_row
+                          and (columns is None or cell[1] in columns)]
+        else:
+            candidates = [(row, col) for row in range(min_row, max_row + 1)
+                          for col in (range(self.columns) if columns is None else columns)]
+
+        results = []
+        for cell in candidates:
+            for email in self.cells.get(cell, ()):
+                distance = haversine_km(latitude, longitude, *self.coordinates[email])
+                if distance <= radius_km:
+                    results.append((email, distance))
+        results.sort(key=lambda result: result[1])
+        return results
+
+
+class ReputationEngine:
+    """Batch-computed reputation scores used for ranking.
+
+    A user's rating is a Bayesian average pulled towards the platform mean by
+    ``prior_strength`` pseudo-reviews, where each review is weighted by the
+    reviewer's own reputation and decays with ``half_life_days``. That rating
+    is scaled by a Beta-smoothed acceptance ratio of the requests the user has
+    answered. New feedback rows and request outcomes are folded in as deltas
+    on each batch; a full recompute also refreshes the prior and reviewer
+    weights.
+    """
+
+    def __init__(self, feedback_store: FeedbackStore, prior_strength: float = 5.0,
+                 half_life_days: float = 180.0, acceptance_prior: Tuple[float, float] = (2.0, 1.0),
+                 batch_size: int = 100, batch_interval_seconds: float = 60.0):
+        self.feedback_store = feedback_store
+        self.prior_strength = prior_strength
+        self.acceptance_prior = acceptance_prior
+        self.batch_size = batch_size
+        self.batch_interval_seconds = batch_interval_seconds
+        self.prior_mean = 3.0
+        self.scores: Dict[str, float] = {}
+        self.smoothed_ratings: Dict[str, float] = {}
+        self.acceptance_ratios: Dict[str, float] = {}
+        self.version = 0
+        # Review weights are stored scaled to _epoch, so old sums never need rewriting
+        self._decay_rate = math.log(2) / (half_life_days * 86400)
+        self._epoch = time.time()
+        self._weighted_sums: Dict[str, float] = {}
+        self._weight_totals: Dict[str, float] = {}
+        self._accepted: Dict[str, int] = {}
+        self._responded: Dict[str, int] = {}
+        self._feedback_watermark = 0
+        self._dirty: set = set()
+        self._last_batch = time.monotonic()
+
+    def record_request_outcome(self, recipient: str, accepted: bool):
+        """Count a recipient's accept or reject decision"""
+        self._responded[recipient] = self._responded.get(recipient, 0) + 1
+        if accepted:
+            self._accepted[recipient] = self._accepted.get(recipient, 0) + 1
+        self._dirty.add(recipient)
+
+    def pending_changes(self) -> int:
+        """Feedback rows and users waiting for the next batch"""
+        return self.feedback_store.count() - self._feedback_watermark + len(self._dirty)
+
+    def _reviewer_weight(self, reviewer: str) -> float:
+        score = self.scores.get(reviewer)
+        if score is None:
+            return 0.75
+        return 0.5 + 0.5 * score / 5.0
+
+    def _ingest_feedback(self):
+        store = self.feedback_store
+        start, end = self._feedback_watermark, store.count()
+        for target_id, reviewer_id, rating, timestamp in zip(
+                store.targets[start:end], store.reviewers[start:end],
+                store.ratings[start:end], store.timestamps[start:end]):
+            target = store.email_for(target_id)
+            weight = (math.exp(self._decay_rate * (timestamp - self._epoch))
+                      * self._reviewer_weight(store.email_for(reviewer_id)))
+            self._weighted_sums[target] = self._weighted_sums.get(target, 0.0) + weight * rating
+            self._weight_totals[target] = self._weight_totals.get(target, 0.0) + weight
+            self._dirty.add(target)
+        self._feedback_watermark = end
+
+    def recompute(self, full: bool = False) -> int:
+        """Fold pending deltas into the scores; returns the number of users rescored"""
+        if full:
+            self._weighted_sums.clear()
+            self._weight_totals.clear()
+            self._feedback_watermark = 0
+        self._ingest_feedback()
+
+        if full:
+            total_weight = sum(self._weight_totals.values())
+            if total_weight:
+                self.prior_mean = sum(self._weighted_sums.values()) / total_weight
+            self._dirty.update(self.scores, self._responded)
+
+        decay_now = math.exp(-self._decay_rate * (time.time() - self._epoch))
+        accept_prior, reject_prior = self.acceptance_prior
+        for email in self._dirty:
+            weight = self._weight_totals.get(email, 0.0) * decay_now
+            weighted_sum = self._weighted_sums.get(email, 0.0) * decay_now
+            rating = ((self.prior_strength * self.prior_mean + weighted_sum)
+                      / (self.prior_strength + weight))
+            acceptance = ((self._accepted.get(email, 0) + accept_prior)
+                          / (self._responded.get(email, 0) + accept_prior + reject_prior))
+            self.smoothed_ratings[email] = rating
+            self.acceptance_ratios[email] = acceptance
+            self.scores[email] = rating * (0.85 + 0.15 * acceptance)
+
+        rescored = len(self._dirty)
+        self._dirty.clear()
+        self._last_batch = time.monotonic()
+        self.version += 1
+        return rescored
+
+    def maybe_recompute(self) -> int:
+        """Run a batch if enough deltas have piled up or the batch interval has passed"""
+        pending = self.pending_changes()
+        if pending and (pending >= self.batch_size or
+                        time.monotonic() - self._last_batch >= self.batch_interval_seconds):
+            return self.recompute()
+        return 0
+
+    def score(self, email: str) -> float:
+        """Current score; users with no data get the prior"""
+        if email in self.scores:
+            return self.scores[email]
+        accept_prior, reject_prior = self.acceptance_prior
+        return self.prior_mean * (0.85 + 0.15 * accept_prior / (accept_prior + reject_prior))
+
+
+class SwapChain:
+    """A multi-party exchange where each participant learns from the next one"""
+
+    def __init__(self, participants: List[str], skills: List[str]):
+        self.participants = participants  # Emails, in cycle order
+        self.skills = skills  # skills[i] is taught by participants[i + 1] to participants[i]
+
+    def __len__(self):
+        return len(self.participants)
+
+    def __str__(self):
+        steps = [f"{self.participants[(i + 1) % len(self)]} teaches {self.participants[i]} {skill}"
+                 for i, skill in enumerate(self.skills)]
+        return " → ".join(steps)
+
+
+class SwapChainFinder:
+    """Finds short exchange cycles in the "wants a skill offered by" graph.
+
+    Users and skills are interned to integers. Instead of user-to-user edges,
+    which grow quadratically with popular skills, each user is filed under
+    the (offered, wanted) skill pairs they bridge, so an update touches only
+    that user's own pairs. A search walks the small skill graph those pairs
+    form, only following skills that can still lead back to the start within
+    the remaining hops, and picks users from the bridge lists as it goes.
+    Shorter cycles are found first and the search stops at the limit.
+    """
+
     def __init__(self):
+        self._user_ids: Dict[str, int] = {}
+        self._emails: List[str] = []
+        self._skill_ids: Dict[str, int] = {}
+        self._skill_names: List[str] = []
+        self._offered: Dict[int, frozenset] = {}  # user -> skill ids
+        self._wanted: Dict[int, frozenset] = {}
+        self._bridges: Dict[Tuple[int, int], List[int]] = {}  # (offered, wanted) skill -> sorted users
+        self._successors: Dict[int, set] = {}  # skill -> skills wanted by someone offering it
+
+    def _user_id(self, email: str) -> int:
+        if email not in self._user_ids:
+            self._user_ids[email] = len(self._emails)
+            self._emails.append(email)
+        return self._user_ids[email]
+
+    def _skill_set(self, skills: List[str]) -> frozenset:
+        ids = set()
+        for skill in skills:
+            if skill not in self._skill_ids:
+                self._skill_ids[skill] = len(self._skill_names)
+                self._skill_names.append(skill)
+            ids.add(self._skill_ids[skill])
+        return frozenset(ids)
+
+    def _remove(self, node: int):
+        offered = self._offered.pop(node, frozenset())
+        wanted = self._wanted.pop(node, frozenset())
+        for pair in itertools.product(offered, wanted):
+            bridge = self._bridges[pair]
+            del bridge[bisect_left(bridge, node)]
+            if not bridge:
+                del self._bridges[pair]
+                self._successors[pair[0]].discard(pair[1])
+
+    def update(self, email: str, skills_offered: List[str], skills_wanted: List[str],
+               active: bool = True):
+        """Re-file one user after a profile change; inactive users leave the graph"""
+        node = self._user_id(email)
+        self._remove(node)
+        if not active:
+            return
+
+        offered = self._skill_set(skills_offered)
+        wanted = self._skill_set(skills_wanted)
+        self._offered[node] = offered
+        self._wanted[node] = wanted
+        for pair in itertools.product(offered, wanted):
+            bridge = self._bridges.setdefault(pair, [])
+            bridge.insert(bisect_left(bridge, node), node)
+            self._successors.setdefault(pair[0], set()).add(pair[1])
+
+    def _cycles_from(self, start: int, length: int, min_node: int, limit: int,
+                     seen: set) -> List[Tuple[List[int], List[int]]]:
+        """Up to limit unseen (users, skills) cycles of exactly length users through start.
+
+        Only users >= min_node are used. skills[i] is the skill users[i] learns
+        from users[i + 1].
+        """
+        wanted = self._wanted.get(start)
+        offered = self._offered.get(start)
+        if not wanted or not offered:
+            return []
+
+        leads_home_memo: Dict[Tuple[int, int], bool] = {}
+
+        def leads_home(skill: int, hops: int) -> bool:
+            """Whether `hops` more bridging users can lead from wanting skill to a skill start offers"""
+            if hops == 0:
+                return skill in offered
+            key = (skill, hops)
+            if key not in leads_home_memo:
+                leads_home_memo[key] = any(leads_home(next_skill, hops - 1)
+                                           for next_skill in self._successors.get(skill, ()))
+            return leads_home_memo[key]
+
+        found: List[Tuple[List[int], List[int]]] = []
+        path = [start]
+        skills: List[int] = []
+
+        def extend(skill: int):
+            """Add the next user, who teaches skill to path[-1]"""
+            users_left = length - len(path)
+            for next_skill in self._successors.get(skill, ()):
+                if not leads_home(next_skill, users_left - 1):
+                    continue
+                bridge = self._bridges[(skill, next_skill)]
+                if bridge[-1] < min_node:
+                    continue
+                for index in range(bisect_left(bridge, min_node), len(bridge)):
+                    user = bridge[index]
+                    if user in path:
+                        continue
+                    path.append(user)
+                    skills.append(skill)
+                    if users_left == 1:
+                        if tuple(path) not in seen:
+                            seen.add(tuple(path))
+                            found.append((list(path), skills + [next_skill]))
+                    else:
+                        extend(next_skill)
+                    path.pop()
+                    skills.pop()
+                    if len(found) >= limit:
+                        return
+
+        for skill in wanted:
+            if leads_home(skill, length - 1):
+                extend(skill)
+                if len(found) >= limit:
+                    break
+        return found
+
+    def _to_chain(self, cycle: Tuple[List[int], List[int]]) -> SwapChain:
+        users, skills = cycle
+        return SwapChain([self._emails[node] for node in users],
+                         [self._skill_names[skill] for skill in skills])
+
+    def find_for_user(self, email: str, max_length: int = 4, limit: int = 10) -> List[SwapChain]:
+        """Shortest exchange cycles that include one user"""
+        node = self._user_ids.get(email)
+        if node is None or node not in self._offered:
+            return []
+        cycles: List[Tuple[List[int], List[int]]] = []
+        seen: set = set()
+        for length in range(3, max_length + 1):
+            if len(cycles) >= limit:
+                break
+            cycles.extend(self._cycles_from(node, length, 0, limit - len(cycles), seen))
+        return [self._to_chain(cycle) for cycle in cycles]
+
+    def propose_all(self, max_length: int = 4, limit: int = 100) -> List[SwapChain]:
+        """Platform-wide batch of distinct cycles, shortest first, each reported once from its lowest node"""
+        cycles: List[Tuple[List[int], List[int]]] = []
+        seen: set = set()
+        for length in range(3, max_length + 1):
+            for node in sorted(self._offered):
+                if len(cycles) >= limit:
+                    break
+                cycles.extend(self._cycles_from(node, length, node, limit - len(cycles), seen))
+        return [self._to_chain(cycle) for cycle in cycles]
+
+
+class PersistentMap:
+    """Immutable hash map with structural sharing.
+
+    Keys are spread over a two-level 64 x 64 trie of small dict leaves. An
+    update copies one leaf and the two tuples on its path and returns a new
+    map, so older versions stay valid and unchanged for as long as a reader
+    holds them, without ever copying the whole map.
+    """
+
+    _FANOUT = 64
+    _EMPTY = (None,) * _FANOUT
+
+    def __init__(self, root: Tuple = _EMPTY, size: int = 0):
+        self._root = root
+        self._size = size
+
+    def _path(self, key) -> Tuple[int, int]:
+        key_hash = hash(key)
+        return key_hash & (self._FANOUT - 1), (key_hash >> 6) & (self._FANOUT - 1)
+
+    def get(self, key, default=None):
+        i, j = self._path(key)
+        branch = self._root[i]
+        leaf = branch[j] if branch is not None else None
+        return leaf.get(key, default) if leaf is not None else default
+
+    def _with_leaf(self, i: int, j: int, leaf: Optional[Dict], size: int) -> "PersistentMap":
+        branch = self._root[i] or self._EMPTY
+        branch = branch[:j] + (leaf or None,) + branch[j + 1:]
+        return PersistentMap(self._root[:i] + (branch,) + self._root[i + 1:], size)
+
+    def set(self, key, value) -> "PersistentMap":
+        """Return a new map with key bound to value"""
+        i, j = self._path(key)
+        branch = self._root[i]
+        leaf = dict((branch[j] if branch is not None else None) or {})
+        size = self._size if key in leaf else self._size + 1
+        leaf[key] = value
+        return self._with_leaf(i, j, leaf, size)
+
+    def remove(self, key) -> "PersistentMap":
+        """Return a new map without key"""
+        if key not in self:
+            return self
+        i, j = self._path(key)
+        leaf = dict(self._root[i][j])
+        del leaf[key]
+        return self._with_leaf(i, j, leaf, self._size - 1)
+
+    def diff(self, older: "PersistentMap") -> Iterator[Tuple[Any, Any, Any]]:
+        """(key, old value, new value) for entries that differ from an older version.
+
+        Branches and leaves shared with the older map are skipped by identity,
+        so the cost follows the number of leaves written since, not the map size.
+        A missing side is reported as None.
+        """
+        for old_branch, branch in zip(older._root, self._root):
+            if old_branch is branch:
+                continue
+            for old_leaf, leaf in zip(old_branch or self._EMPTY, branch or self._EMPTY):
+                if old_leaf is leaf:
+                    continue
+                old_leaf, leaf = old_leaf or {}, leaf or {}
+                for key, value in leaf.items():
+                    old_value = old_leaf.get(key)
+                    if old_value is not value:
+                        yield key, old_value, value
+                for key in old_leaf.keys() - leaf.keys():
+                    yield key, old_leaf[key], None
+
+    def __contains__(self, key) -> bool:
+        sentinel = object()
+        return self.get(key, sentinel) is not sentinel
+
+    def __len__(self) -> int:
+        return self._size
+
+    def items(self) -> Iterator[Tuple[Any, Any]]:
+        for branch in self._root:
+            if branch is None:
+                continue
+            for leaf in branch:
+                if leaf is not None:
+                    yield from leaf.items()
+
+    def values(self) -> Iterator[Any]:
+        for _, value in self.items():
+            yield value
+
+    def __iter__(self) -> Iterator[Any]:
+        for key, _ in self.items():
+            yield key
+
+
+class UserRecord(NamedTuple):
+    """Frozen copy of a user's state as of one snapshot version"""
+    email: str
+    user_id: str
+    name: str
+    location: Optional[str]
+    skills_offered: Tuple[str, ...]
+    skills_wanted: Tuple[str, ...]
+    availability: str
+    is_public: bool
+    is_banned: bool
+    is_admin: bool
+    created_at: datetime.datetime
+    feedback_count: int
+    average_rating: float
+
+    @classmethod
+    def from_user(cls, user: "User") -> "UserRecord":
+        return cls(
+            user.email, user.user_id, user.name, user.location,
+            tuple(user.skills_offered), tuple(user.skills_wanted), user.availability,
+            user.is_public, user.is_banned, isinstance(user, Admin), user.created_at,
+            user.get_feedback_count(), user.get_average_rating(),
+        )
+
+
+class RequestRecord(NamedTuple):
+    """Frozen copy of a swap request as of one snapshot version"""
+    request_id: str
+    requester_id: str
+    recipient_id: str
+    offered_skill: str
+    requested_skill: str
+    status: RequestStatus
+    version: int
+    created_at: datetime.datetime
+    updated_at: datetime.datetime
+
+    @classmethod
+    def from_request(cls, request: "SwapRequest") -> "RequestRecord":
+        return cls(
+            request.request_id, request.requester_id, request.recipient_id,
+            request.offered_skill, request.requested_skill, request.status,
+            request.version, request.created_at, request.updated_at,
+        )
+
+
+class PlatformSnapshot:
+    """Consistent read-only view of users and requests at one version.
+
+    Taking a snapshot is O(1); writers keep publishing new versions and never
+    wait for readers, and the snapshot never sees their changes.
+    """
+
+    def __init__(self, version: int, users: PersistentMap, requests: PersistentMap,
+                 feedback_count: int):
+        self.version = version
+        self._users = users
+        self._requests = requests
+        self.feedback_count = feedback_count
+        self.taken_at = datetime.datetime.now()
+
+    def users(self) -> Iterator[UserRecord]:
+        return self._users.values()
+
+    @property
+    def user_map(self) -> PersistentMap:
+        """The users map itself; it is a new object only when some user changed"""
+        return self._users
+
+    def requests(self) -> Iterator[RequestRecord]:
+        return self._requests.values()
+
+    def get_user(self, email: str) -> Optional[UserRecord]:
+        return self._users.get(email)
+
+    def get_request(self, request_id: str) -> Optional[RequestRecord]:
+        return self._requests.get(request_id)
+
+    def user_count(self) -> int:
+        return len(self._users)
+
+    def request_count(self) -> int:
+        return len(self._requests)
+
+
+class ColumnarUserTable:
+    """Column-oriented copy of a snapshot's users for vectorised analytics (needs NumPy).
+
+    Skill lists are stored CSR-style: the skills of row i are
+    ``offered_skill_ids[offered_offsets[i]:offered_offsets[i + 1]]``.
+    Category membership is a uint16 bitmask per user, with one bit per
+    TechnicalSkills category. ``apply`` brings the table up to a newer
+    snapshot by patching only the rows of users that changed since.
+    """
+
+    _SCALAR_COLUMNS = (
+        ("offered_categories", "uint16"),
+        ("wanted_categories", "uint16"),
+        ("ratings", "float32"),
+        ("feedback_counts", "int32"),
+        ("created_at", "int64"),
+        ("is_banned", "bool"),
+        ("is_public", "bool"),
+        ("is_admin", "bool"),
+    )
+
+    def __init__(self, snapshot: PlatformSnapshot):
+        if np is None:
+            raise ImportError("ColumnarUserTable requires NumPy (pip install numpy)")
+
+        self.categories = list(TechnicalSkills.get_skills_by_category())
+        self.skill_names: List[str] = TechnicalSkills.get_all_skills()
+        self.skill_ids: Dict[str, int] = {name: i for i, name in enumerate(self.skill_names)}
+        self._category_bits: Dict[str, int] = {}
+        for bit, skills in enumerate(TechnicalSkills.get_skills_by_category().values()):
+            for skill in skills:
+                self._category_bits[skill] = self._category_bits.get(skill, 0) | (1 << bit)
+        self._reset()
+        self.apply(snapshot)
+
+    def _reset(self):
+        self.version = 0
+        self.user_map = PersistentMap()
+        self.emails: List[str] = []
+        self._rows: Dict[str, int] = {}  # email -> row
+        for column, dtype in self._SCALAR_COLUMNS:
+            setattr(self, column, np.zeros(0, dtype=dtype))
+        for kind in ("offered", "wanted"):
+            setattr(self, f"{kind}_skill_ids", np.zeros(0, dtype=np.int32))
+            setattr(self, f"{kind}_offsets", np.zeros(1, dtype=np.int64))
+
+    def _encode_skills(self, skills: Tuple[str, ...]) -> Tuple[List[int], int]:
+        ids = []
+        bits = 0
+        for skill in skills:
+            if skill not in self.skill_ids:
+                self.skill_ids[skill] = len(self.skill_names)
+                self.skill_names.append(skill)
+            ids.append(self.skill_ids[skill])
+            bits |= self._category_bits.get(skill, 0)
+        return ids, bits
+
+    def _scalar_values(self, record: UserRecord, offered_bits: int, wanted_bits: int) -> Tuple:
+        return (offered_bits, wanted_bits, record.average_rating, record.feedback_count,
+                int(record.created_at.timestamp()), record.is_banned, record.is_public, record.is_admin)
+
+    def _patch_skills(self, kind: str, segments: Dict[int, List[int]],
+                      appended_ids: List[int], appended_counts: List[int]):
+        """Replace the skill segments of existing rows and add those of appended rows"""
+        ids = getattr(self, f"{kind}_skill_ids")
+        offsets = getattr(self, f"{kind}_offsets")
+        counts = np.diff(offsets)
+        pieces = []
+        copied_to = 0
+        for row in sorted(segments):
+            pieces.append(ids[copied_to:offsets[row]])
+            pieces.append(np.array(segments[row], dtype=np.int32))
+            copied_to = offsets[row + 1]
+            counts[row] = len(segments[row])
+        pieces.append(ids[copied_to:])
+        pieces.append(np.array(appended_ids, dtype=np.int32))
+        counts = np.concatenate((counts, np.array(appended_counts, dtype=np.int64)))
+        setattr(self, f"{kind}_skill_ids", np.concatenate(pieces))
+        setattr(self, f"{kind}_offsets", np.concatenate(([0], np.cumsum(counts, dtype=np.int64))))
+
+    def apply(self, snapshot: PlatformSnapshot):
+        """Patch the rows of users that changed between this table's snapshot and a newer one"""
+        updated_rows: List[int] = []
+        updated = [[] for _ in self._SCALAR_COLUMNS]
+        appended = [[] for _ in self._SCALAR_COLUMNS]
+        segments: Dict[str, Dict[int, List[int]]] = {"offered": {}, "wanted": {}}
+        appended_ids: Dict[str, List[int]] = {"offered": [], "wanted": []}
+        appended_counts: Dict[str, List[int]] = {"offered": [], "wanted": []}
+        for email, old, record in snapshot.user_map.diff(self.user_map):
+            if record is None:
+                # A user was removed, so later rows would shift; start over
+                self._reset()
+                return self.apply(snapshot)
+            offered_ids, offered_bits = self._encode_skills(record.skills_offered)
+            wanted_ids, wanted_bits = self._encode_skills(record.skills_wanted)
+            values = self._scalar_values(record, offered_bits, wanted_bits)
+            row = self._rows.get(email)
+            if row is None:
+                self._rows[email] = len(self.emails)
+                self.emails.append(email)
+                for column, value in zip(appended, values):
+                    column.append(value)
+                for kind, ids in (("offered", offered_ids), ("wanted", wanted_ids)):
+                    appended_ids[kind].extend(ids)
+                    appended_counts[kind].append(len(ids))
+                continue
+            updated_rows.append(row)
+            for column, value in zip(updated, values):
+                column.append(value)
+            if old.skills_offered != record.skills_offered:
+                segments["offered"][row] = offered_ids
+            if old.skills_wanted != record.skills_wanted:
+                segments["wanted"][row] = wanted_ids
+
+        for (column, dtype), new_values, changed_values in zip(self._SCALAR_COLUMNS, appended, updated):
+            column_values = getattr(self, column)
+            if changed_values:
+                column_values[updated_rows] = np.array(changed_values, dtype=dtype)
+            if new_values:
+                column_values = np.concatenate((column_values, np.array(new_values, dtype=dtype)))
+            setattr(self, column, column_values)
+        for kind in ("offered", "wanted"):
+            if segments[kind] or appended_counts[kind]:
+                self._patch_skills(kind, segments[kind], appended_ids[kind], appended_counts[kind])
+        self.version = snapshot.version
+        self.user_map = snapshot.user_map
+
+    def __len__(self):
+        return len(self.emails)
+
+    def active_mask(self):
+        """Rows for non-admin, non-banned users"""
+        return ~self.is_admin & ~self.is_banned
+
+    def cohort_stats(self, mask=None) -> Dict[str, Any]:
+        """Summary statistics for the rows selected by a boolean mask"""
+        if mask is None:
+            mask = ~self.is_admin
+        count = int(mask.sum())
+        reviewed = mask & (self.feedback_counts > 0)
+        return {
+            "users": count,
+            "banned": int((mask & self.is_banned).sum()),
+            "public": int((mask & self.is_public).sum()),
+            "reviews": int(self.feedback_counts[mask].sum()),
+            "mean_rating": float(self.ratings[reviewed].mean()) if reviewed.any() else 0.0,
+            "mean_skills_offered": float(np.diff(self.offered_offsets)[mask].mean()) if count else 0.0,
+        }
+
+    def growth_curve(self, bucket_seconds: int = 86400) -> Tuple[Any, Any]:
+        """(bucket start epochs, cumulative non-admin signups) per time bucket"""
+        buckets = self.created_at[~self.is_admin] // bucket_seconds
+        starts, counts = np.unique(buckets, return_counts=True)
+        return starts * bucket_seconds, np.cumsum(counts)
+
+    def _skill_counts(self, skill_ids, offsets, mask):
+        row_mask = np.repeat(mask, np.diff(offsets))
+        return np.bincount(skill_ids[row_mask], minlength=len(self.skill_names))
+
+    def skill_gaps(self, top: int = 10) -> List[Tuple[str, int, int]]:
+        """(skill, supply, demand) for the skills with the largest demand minus supply"""
+        mask = self.active_mask()
+        supply = self._skill_counts(self.offered_skill_ids, self.offered_offsets, mask)
+        demand = self._skill_counts(self.wanted_skill_ids, self.wanted_offsets, mask)
+        order = np.argsort(supply - demand, kind="stable")[:top]
+        return [(self.skill_names[i], int(supply[i]), int(demand[i]))
+                for i in order if demand[i] > supply[i]]
+
+    def category_gaps(self) -> List[Tuple[str, int, int]]:
+        """(category, users offering, users wanting) for every TechnicalSkills category"""
+        mask = self.active_mask()
+        offered = self.offered_categories[mask]
+        wanted = self.wanted_categories[mask]
+        bits = (np.uint16(1) << np.arange(len(self.categories), dtype=np.uint16))
+        supply = ((offered[:, None] & bits) != 0).sum(axis=0)
+        demand = ((wanted[:, None] & bits) != 0).sum(axis=0)
+        return [(name, int(supply[i]), int(demand[i])) for i, name in enumerate(self.categories)]
+
+
+class RingCounter:
+    """Event count over a sliding window, kept in fixed time buckets"""
+
+    def __init__(self, bucket_seconds: int, buckets: int):
+        self.bucket_seconds = bucket_seconds
+        self.counts = [0] * buckets
+        self.stamps = [-1] * buckets  # Absolute bucket number held in each slot
+        self.newest_bucket = -1
+
+    def add(self, timestamp: float, amount: int = 1):
+        bucket = int(timestamp // self.bucket_seconds)
+        self.newest_bucket = max(self.newest_bucket, bucket)
+        if bucket <= self.newest_bucket - len(self.counts):
+            return  # Late event already outside the window; its slot now holds newer counts
+        slot = bucket % len(self.counts)
+        if self.stamps[slot] != bucket:
+            self.stamps[slot] = bucket
+            self.counts[slot] = 0
+        self.counts[slot] += amount
+
+    def total(self, now: float) -> int:
+        """Events in the window ending at now"""
+        oldest = int(now // self.bucket_seconds) - len(self.counts)
+        return sum(count for count, stamp in zip(self.counts, self.stamps) if stamp > oldest)
+
+
+class SkillDemandTracker:
+    """Incremental supply/demand counts per skill with windowed activity.
+
+    Current supply and demand are the number of active users offering and
+    wanting each skill, updated from profile diffs. Activity events (a skill
+    newly offered or wanted, requested in a swap, or accepted) go into ring
+    buffers for each window, so a report only touches per-skill counters and
+    never rescans users or requests.
+    """
+
+    WINDOWS = {"hour": (60, 60), "day": (3600, 24), "week": (86400, 7)}  # (bucket_seconds, buckets)
+    EVENTS = ("offered", "wanted", "requested", "accepted")
+
+    def __init__(self):
+        self.supply: Dict[str, int] = {}
+        self.demand: Dict[str, int] = {}
+        self._activity: Dict[str, Dict[Tuple[str, str], RingCounter]] = {}
+        self._contributions: Dict[str, Tuple[frozenset, frozenset]] = {}
+        # Skills on each profile regardless of ban state, so re-activation isn't counted as activity
+        self._profiles: Dict[str, Tuple[frozenset, frozenset]] = {}
+        self._category_of: Dict[str, List[str]] = {}
+        for category, skills in TechnicalSkills.get_skills_by_category().items():
+            for skill in skills:
+                self._category_of.setdefault(skill, []).append(category)
+
+    def record_event(self, skill: str, event: str, timestamp: Optional[float] = None):
+        """Count one activity event for a skill in every window"""
+        timestamp = time.time() if timestamp is None else timestamp
+        counters = self._activity.get(skill)
+        if counters is None:
+            counters = self._activity[skill] = {
+                (window, name): RingCounter(bucket_seconds, buckets)
+                for window, (bucket_seconds, buckets) in self.WINDOWS.items()
+                for name in self.EVENTS
+            }
+        for window in self.WINDOWS:
+            counters[(window, event)].add(timestamp)
+
+    def update_user(self, email: str, skills_offered: List[str], skills_wanted: List[str],
+                    active: bool = True):
+        """Apply the difference between a user's previous and current skill lists"""
+        old_offered, old_wanted = self._contributions.get(email, (frozenset(), frozenset()))
+        listed_offered, listed_wanted = self._profiles.get(email, (frozenset(), frozenset()))
+        profile_offered, profile_wanted = frozenset(skills_offered), frozenset(skills_wanted)
+        new_offered = profile_offered if active else frozenset()
+        new_wanted = profile_wanted if active else frozenset()
+        for counts, old, new, event in ((self.supply, old_offered, new_offered, "offered"),
+                                        (self.demand, old_wanted, new_wanted, "wanted")):
+            for skill in old - new:
+                counts[skill] -= 1
+            for skill in new - old:
+                counts[skill] = counts.get(skill, 0) + 1
+        if active:
+            # Only skills added to the profile are activity; unbanning re-adds supply silently
+            for skill in profile_offered - listed_offered:
+                self.record_event(skill, "offered")
+            for skill in profile_wanted - listed_wanted:
+                self.record_event(skill, "wanted")
+        self._contributions[email] = (new_offered, new_wanted)
+        self._profiles[email] = (profile_offered, profile_wanted)
+
+    def _row(self, skill: str, window: str, now: float) -> Dict[str, Any]:
+        supply = self.supply.get(skill, 0)
+        demand = self.demand.get(skill, 0)
+        row = {"skill": skill, "supply": supply, "demand": demand,
+               "ratio": supply / demand if demand else float("inf")}
+        counters = self._activity.get(skill)
+        for event in self.EVENTS:
+            row[event] = counters[(window, event)].total(now) if counters else 0
+        return row
+
+    def skill_report(self, window: str = "week", category: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Per-skill supply, demand and windowed activity, most under-supplied first"""
+        if window not in self.WINDOWS:
+            raise ValueError(f"Unknown window {window!r}; expected one of {list(self.WINDOWS)}")
+        now = time.time()
+        skills = set(self.supply) | set(self.demand) | set(self._activity)
+        if category is not None:
+            skills = {skill for skill in skills if category in self._category_of.get(skill, ())}
+        rows = [self._row(skill, window, now) for skill in skills]
+        rows.sort(key=lambda row: (row["ratio"], -row["demand"], row["skill"]))
+        return rows
+
+    def category_report(self, window: str = "week") -> List[Dict[str, Any]]:
+        """Skill rows summed per TechnicalSkills category, most under-supplied first"""
+        totals: Dict[str, Dict[str, Any]] = {}
+        for row in self.skill_report(window):
+            for category in self._category_of.get(row["skill"], ()):
+                total = totals.setdefault(category, {"category": category, "supply": 0, "demand": 0,
+                                                     **{event: 0 for event in self.EVENTS}})
+                for field in ("supply", "demand") + self.EVENTS:
+                    total[field] += row[field]
+        for total in totals.values():
+            total["ratio"] = total["supply"] / total["demand"] if total["demand"] else float("inf")
+        return sorted(totals.values(), key=lambda total: (total["ratio"], -total["demand"]))
+
+
+class ChangeRecord:
+    def __init__(self, sequence: int, entity: str, key: str, operation: str,
+                 changes: Dict[str, Any], timestamp: Optional[str] = None):
+        self.sequence = sequence
+        self.entity = entity  # "user", "request" or "feedback"
+        self.key = key
+        self.operation = operation  # "create" or "update"
+        self.changes = changes  # field -> [old, new]
+        self.timestamp = timestamp or datetime.datetime.now().isoformat()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"sequence": self.sequence, "entity": self.entity, "key": self.key,
+                "operation": self.operation, "changes": self.changes, "timestamp": self.timestamp}
+
+    def __str__(self):
+        return f"#{self.sequence} {self.operation} {self.entity} {self.key}: {self.changes}"
+
+
+def _to_json_value(value: Any) -> Any:
+    """Convert a field value into something json.dumps accepts"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return [_to_json_value(item) for item in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted(_to_json_value(item) for item in value)
+    return value
+
+
+class ChangeLog:
+    """In-memory change-data-capture log with monotonic sequence numbers.
+
+    Consumers remember the last sequence they processed and call
+    ``read(offset)`` to fetch the records after it in batches.
+    """
+
+    def __init__(self):
+        self._records: List[ChangeRecord] = []
+        self.last_sequence = 0
+        self._write_lock = threading.Lock()  # Serialises sequence assignment and storage
+
+    def _next_record(self, entity: str, key: str, operation: str,
+                     changes: Dict[str, Tuple[Any, Any]]) -> ChangeRecord:
+        self.last_sequence += 1
+        fields = {field: [_to_json_value(old), _to_json_value(new)]
+                  for field, (old, new) in changes.items()}
+        return ChangeRecord(self.last_sequence, entity, key, operation, fields)
+
+    def _store(self, records: List[ChangeRecord]):
+        self._records.extend(records)
+
+    def append(self, entity: str, key: str, operation: str,
+               changes: Dict[str, Tuple[Any, Any]]) -> int:
+        """Record one change and return its sequence number"""
+        return self.append_many([(entity, key, operation, changes)])
+
+    def append_many(self, entries: List[Tuple[str, str, str, Dict[str, Tuple[Any, Any]]]]) -> int:
+        """Record a batch of (entity, key, operation, changes); returns the last sequence"""
+        with self._write_lock:
+            records = [self._next_record(*entry) for entry in entries]
+            if records:
+                self._store(records)
+            return self.last_sequence
+
+    def read(self, offset: int = 0, max_records: int = 100) -> List[ChangeRecord]:
+        """Records with sequence greater than offset, oldest first"""
+        offset = max(offset, 0)
+        return self._records[offset:offset + max_records]  # Sequence n is at index n - 1
+
+
+class FileChangeLog(ChangeLog):
+    """Change log persisted as JSON lines, one record per line.
+
+    Byte offsets of every record are kept in memory so a read from any
+    sequence seeks straight to it. Reopening the file resumes the sequence;
+    a torn final line left by a crash mid-append is truncated away, and a
+    complete line that can't be decoded keeps its sequence slot but is
+    skipped by readers.
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._positions: List[Optional[int]] = []  # Byte offset of each record, by sequence - 1
+        try:
+            with open(path, "r+b") as log_file:
+                position = 0
+                for line in log_file:
+                    if not line.endswith(b"\n"):
+                        # Every record is written with its newline last, so an
+                        # unterminated line can only be an interrupted append
+                        log_file.truncate(position)
+                        break
+                    if line.strip():
+                        try:
+                            self.last_sequence = json.loads(line)["sequence"]
+                            self._positions.append(position)
+                        except (ValueError, KeyError, TypeError):
+                            self.last_sequence += 1
+                            self._positions.append(None)
+                    position += len(line)
+        except FileNotFoundError:
+            pass
+
+    def _store(self, records: List[ChangeRecord]):
+        with open(self.path, "ab") as log_file:
+            position = log_file.tell()
+            for record in records:
+                line = (json.dumps(record.to_dict()) + "\n").encode("utf-8")
+                log_file.write(line)
+                log_file.flush()
+                self._positions.append(position)  # Only visible to readers once written
+                position += len(line)
+
+    def read(self, offset: int = 0, max_records: int = 100) -> List[ChangeRecord]:
+        offset = max(offset, 0)
+        # Records past this point may still be mid-write by another thread
+        end = min(len(self._positions), offset + max_records)
+        while offset < end and self._positions[offset] is None:
+            offset += 1
+        if offset >= end:
+            return []
+        records = []
+        with open(self.path, "rb") as log_file:
+            log_file.seek(self._positions[offset])
+            remaining = end - offset
+            while remaining:
+                line = log_file.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                remaining -= 1
+                try:
+                    records.append(ChangeRecord(**json.loads(line)))
+                except (ValueError, TypeError):
+                    continue  # Undecodable line found when the log was opened
+        return records
+
+
+class ProfileCache:
+    """Bounded LRU cache with TTL for rendered profile and home page payloads.
+
+    Entries are keyed by (kind, owner, ..., version) and indexed by owner so a
+    change to one user drops exactly that user's entries.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()  # key -> (expires_at, value)
+        self._keys_by_owner: Dict[str, set] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _remove(self, key: Tuple):
+        self._entries.pop(key, None)
+        owner_keys = self._keys_by_owner.get(key[1])
+        if owner_keys is not None:
+            owner_keys.discard(key)
+            if not owner_keys:
+                del self._keys_by_owner[key[1]]
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        """Return a cached value, or None on a miss or expired entry"""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: Tuple, value: Any):
+        """Store a value, evicting the least recently used entry if full"""
+        self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._keys_by_owner.setdefault(key[1], set()).add(key)
+        while len(self._entries) > self.max_entries:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def get_or_render(self, key: Tuple, render) -> Any:
+        """Return the cached value for key, rendering and storing it on a miss"""
+        value = self.get(key)
+        if value is None:
+            value = render()
+            self.put(key, value)
+        return value
+
+    def invalidate(self, owner: str):
+        """Drop every entry belonging to owner"""
+        for key in list(self._keys_by_owner.get(owner, ())):
+            self._remove(key)
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss metrics for sizing the cache"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+class SkillSwapPlatform:
+    HOME_PAGE_CACHE_OWNER = "__home__"
+
+    CHANGE_LOG_EXCLUDED_FIELDS = {"password"}
+
+    def __init__(self, change_log: Optional[ChangeLog] = None,
+                 seed_sample_data: bool = True):
         self.users: Dict[str, User] = {}  # email -> User
         self.swap_requests: List[SwapRequest] = []
+        self._requests_by_id: Dict[str, SwapRequest] = {}
+        self._incoming_requests: Dict[str, List[SwapRequest]] = {}  # user_id -> requests
+        self._outgoing_requests: Dict[str, List[SwapRequest]] = {}  # user_id -> requests
         self.current_user: Optional[User] = None
         self.global_announcements: List[str] = []
+        self.event_bus = EventBus()
+        self.profile_cache = ProfileCache()
+        self.feedback_store = FeedbackStore()
+        self.reputation = ReputationEngine(self.feedback_store)
+        self._users_by_id: Dict[str, User] = {}
+        # (version, user records, request records, feedback count), replaced as a whole on every write
+        self._published_state: Tuple[int, PersistentMap, PersistentMap, int] = (
+            0, PersistentMap(), PersistentMap(), 0
+        )
+        self._publish_lock = threading.Lock()  # Writers only; snapshot() never takes it
+        self._columnar_table: Optional[ColumnarUserTable] = None
+        self._columnar_lock = threading.Lock()  # One analytics caller patches the table at a time
+        self._batch_depth = 0
+        self.change_log = change_log if change_log is not None else ChangeLog()
+        self._pending_change_records: List[Tuple[str, str, str, Dict[str, Tuple[Any, Any]]]] = []
+        self._logged_feedback_rows = 0
+        self._pending_user_changes: Dict[str, Optional[Dict[str, Tuple[Any, Any]]]] = {}
+        self._directory_version = 0
+        self.availability_index = AvailabilityIndex()
+        self.skill_index = SkillIndex()
+        self.geo_index = GeoIndex()
+        self.swap_chains = SwapChainFinder()
+        self.skill_demand = SkillDemandTracker()
         self.all_technical_skills = TechnicalSkills.get_all_skills()
         
-        # Initialize with sample data
-        self._create_sample_data()
+        # Initialize with sample data. Pass seed_sample_data=False when reopening a
+        # persistent log: the demo users get fresh ids and would be logged again
+        if seed_sample_data:
+            self._create_sample_data()
 
     def _create_sample_data(self):
         """Create sample users with comprehensive technical skills"""
@@ -417,12 +2202,12 @@ class SkillSwapPlatform:
             user = User(user_data["name"], user_data["email"], user_data["password"])
             user.update_profile(**{k: v for k, v in user_data.items() 
                                  if k not in ["name", "email", "password"]})
-            self.users[user.email] = user
+            self._register_user(user)
 
         # Create admin user
         admin = Admin("Platform Admin", "admin@skillwise.in", "admin123")
         admin.skills_offered = ["Platform Management", "User Support", "System Administration"]
-        self.users[admin.email] = admin
+        self._register_user(admin)
 
         # Add sample feedback with technical context
         sakshi = self.users["sakshi@skillwise.in"]
@@ -456,7 +2241,10 @@ class SkillSwapPlatform:
             "Hi Yashpal! I can teach you cybersecurity best practices. Could you help me with Node.js backend development?"
         )
         
-        self.swap_requests.extend([request1, request2, request3])
+        for request in [request1, request2, request3]:
+            self._add_swap_request(request)
+        self.reputation.record_request_outcome(yashpal.email, True)
+        self.reputation.recompute(full=True)
 
     def register_user(self, name: str, email: str, password: str) -> bool:
         """Register a new user"""
@@ -465,10 +2253,196 @@ class SkillSwapPlatform:
             return False
         
         user = User(name, email, password)
-        self.users[email] = user
+        self._register_user(user)
         print(f"✅ User {name} registered successfully!")
         return True
 
+    def _register_user(self, user: User):
+        """Add a user to the platform and subscribe derived state to its changes"""
+        self.users[user.email] = user
+        self._users_by_id[user.user_id] = user
+        user.attach_feedback_store(self.feedback_store)
+        user.add_change_listener(self._on_user_change)
+        self._on_user_change(user, {})
+
+    def _add_swap_request(self, request: SwapRequest):
+        """Store a swap request and index it by id and participant"""
+        self.swap_requests.append(request)
+        self._requests_by_id[request.request_id] = request
+        self._incoming_requests.setdefault(request.recipient_id, []).append(request)
+        self._outgoing_requests.setdefault(request.requester_id, []).append(request)
+        self._publish_request(request)
+        self._record_change("request", request.request_id, "create", {
+            field: (None, value) for field, value in vars(request).items()
+            if not field.startswith("_")
+        })
+        self.skill_demand.record_event(request.requested_skill, "requested",
+                                       request.created_at.timestamp())
+        if request.status == RequestStatus.ACCEPTED:
+            self.skill_demand.record_event(request.requested_skill, "accepted",
+                                           request.updated_at.timestamp())
+
+    def _publish_request(self, request: SwapRequest):
+        """Publish a new snapshot version containing the request's current state"""
+        record = RequestRecord.from_request(request)
+        with self._publish_lock:
+            version, users, requests, feedback_count = self._published_state
+            self._published_state = (version + 1, users, requests.set(request.request_id, record),
+                                     feedback_count)
+
+    def _on_request_status_change(self, request: SwapRequest, old_status: RequestStatus):
+        """Propagate a request status change to snapshots and the change log"""
+        self._publish_request(request)
+        self._record_change("request", request.request_id, "update", {
+            "status": (old_status, request.status),
+            "version": (request.version - 1, request.version),
+        })
+
+    def _status_notification(self, request: SwapRequest, notify_user_id: str,
+                             by: str) -> Tuple[str, str, Dict[str, Any]]:
+        """Event-bus message telling a participant about a request's new status"""
+        return (notify_user_id, f"swap_request.{request.status.value.lower()}", {
+            "request_id": request.request_id,
+            "by": by,
+            "offered_skill": request.offered_skill,
+            "requested_skill": request.requested_skill,
+        })
+
+    def _record_response(self, request: SwapRequest, accept: bool):
+        """Update derived state after the recipient accepted or rejected a request"""
+        self._on_request_status_change(request, RequestStatus.PENDING)
+        self.reputation.record_request_outcome(self.current_user.email, accept)
+        if accept:
+            self.skill_demand.record_event(request.requested_skill, "accepted")
+
+    def _publish_user(self, user: User):
+        """Publish a new snapshot version containing the user's current state"""
+        record = UserRecord.from_user(user)
+        with self._publish_lock:
+            version, users, requests, feedback_count = self._published_state
+            # Count only reviews reflected in the published records, not the live store
+            previous = users.get(user.email)
+            feedback_count += record.feedback_count - (previous.feedback_count if previous else 0)
+            self._published_state = (version + 1, users.set(user.email, record), requests,
+                                     feedback_count)
+
+    def snapshot(self) -> PlatformSnapshot:
+        """Take an immutable view of users and requests for long-running readers"""
+        return PlatformSnapshot(*self._published_state)
+
+    def get_columnar_table(self) -> Optional[ColumnarUserTable]:
+        """Columnar mirror of the current snapshot; only rows of changed users are patched"""
+        if np is None:
+            print("❌ Columnar analytics require NumPy (pip install numpy)")
+            return None
+        snapshot = self.snapshot()
+        with self._columnar_lock:
+            if self._columnar_table is None:
+                self._columnar_table = ColumnarUserTable(snapshot)
+            elif self._columnar_table.user_map is not snapshot.user_map:
+                self._columnar_table.apply(snapshot)
+        return self._columnar_table
+
+    @contextmanager
+    def _batched_changes(self):
+        """Defer derived-state updates until the outermost batch finishes.
+
+        Changes to the same user are merged, so each index is updated once per
+        user, the home page is invalidated once per batch and the change log
+        receives the whole batch in a single append.
+        """
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            if self._batch_depth == 1 and self._pending_user_changes:
+                pending, self._pending_user_changes = self._pending_user_changes, {}
+                for email, changes in pending.items():
+                    self._apply_user_change(self.users[email], changes or {}, refresh_directory=False)
+                self.profile_cache.invalidate(self.HOME_PAGE_CACHE_OWNER)
+                self._directory_version += 1
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._pending_change_records:
+                records, self._pending_change_records = self._pending_change_records, []
+                self.change_log.append_many(records)
+
+    def _record_change(self, entity: str, key: str, operation: str,
+                       changes: Dict[str, Tuple[Any, Any]]):
+        """Append to the change log, or buffer until the current batch ends"""
+        if self._batch_depth:
+            self._pending_change_records.append((entity, key, operation, changes))
+        else:
+            self.change_log.append(entity, key, operation, changes)
+
+    def _record_user_change(self, user: User, changes: Dict[str, Tuple[Any, Any]]):
+        if changes:
+            operation = "update"
+        else:
+            operation = "create"
+            changes = {field: (None, value) for field, value in vars(user).items()
+                       if not field.startswith("_") and field not in ("feedback_store", "version")}
+        if "feedback" in changes:
+            changes = dict(changes)
+            changes["feedback_count"] = changes.pop("feedback")
+        changes = {field: diff for field, diff in changes.items()
+                   if field not in self.CHANGE_LOG_EXCLUDED_FIELDS}
+        if changes:
+            self._record_change("user", user.email, operation, changes)
+
+        # Feedback rows are logged straight from the append-only store
+        store = self.feedback_store
+        for row in range(self._logged_feedback_rows, store.count()):
+            feedback = store.row(row)
+            self._record_change("feedback", str(row), "create", {
+                "target": (None, store.email_for(store.targets[row])),
+                "from_user": (None, feedback.from_user),
+                "rating": (None, feedback.rating),
+                "comment": (None, feedback.comment),
+                "timestamp": (None, feedback.timestamp),
+            })
+        self._logged_feedback_rows = store.count()
+
+    def read_changes(self, offset: int = 0, max_records: int = 100) -> List[ChangeRecord]:
+        """Fetch change-data-capture records after the given sequence number"""
+        return self.change_log.read(offset, max_records)
+
+    def _on_user_change(self, user: User, changes: Dict[str, Tuple[Any, Any]]):
+        """Invalidate derived state after a user is added or modified"""
+        if self._batch_depth == 0:
+            self._apply_user_change(user, changes)
+            return
+
+        if not changes:
+            self._pending_user_changes[user.email] = None  # Re-index everything
+        elif self._pending_user_changes.get(user.email, {}) is not None:
+            merged = self._pending_user_changes.setdefault(user.email, {})
+            for field, (old_value, new_value) in changes.items():
+                merged[field] = (merged[field][0] if field in merged else old_value, new_value)
+
+    def _apply_user_change(self, user: User, changes: Dict[str, Tuple[Any, Any]],
+                           refresh_directory: bool = True):
+        self._publish_user(user)
+        self._record_user_change(user, changes)
+        self.profile_cache.invalidate(user.email)
+        if refresh_directory:
+            self.profile_cache.invalidate(self.HOME_PAGE_CACHE_OWNER)
+            self._directory_version += 1
+        if not changes or "availability" in changes or "timezone" in changes:
+            self.availability_index.update(
+                user.email, AvailabilitySchedule.parse(user.availability, user.timezone)
+            )
+        if not changes or "skills_offered" in changes:
+            old_skills = changes["skills_offered"][0] if changes else []
+            self.skill_index.update(user.email, old_skills, user.skills_offered)
+        if not changes or "location" in changes:
+            place = Gazetteer.resolve(user.location)
+            self.geo_index.update(user.email, place[1:] if place else None)
+        if not changes or changes.keys() & {"skills_offered", "skills_wanted", "is_public", "is_banned"}:
+            self.swap_chains.update(user.email, user.skills_offered, user.skills_wanted,
+                                    active=self._is_listed(user))
+            self.skill_demand.update_user(user.email, user.skills_offered, user.skills_wanted,
+                                          active=not user.is_banned and not isinstance(user, Admin))
+
     def login(self, email: str, password: str) -> bool:
         """Authenticate user login"""
         if email not in self.users:
@@ -484,14 +2458,21 @@ class SkillSwapPlatform:
             print("❌ Invalid password!")
             return False
         
+        if self.current_user is not None and self.current_user is not user:
+            self.event_bus.unsubscribe(self.current_user.user_id)
         self.current_user = user
+        self.event_bus.subscribe(user.user_id)
         print(f"✅ Welcome back, {user.name}!")
+        pending = self.event_bus.pending_count(user.user_id)
+        if pending:
+            print(f"🔔 You have {pending} new notification(s).")
         return True
 
     def logout(self):
         """Log out current user"""
         if self.current_user:
             print(f"👋 Goodbye, {self.current_user.name}!")
+            self.event_bus.unsubscribe(self.current_user.user_id)
             self.current_user = None
         else:
             print("❌ No user is currently logged in.")
@@ -501,10 +2482,11 @@ class SkillSwapPlatform:
         return self.current_user is not None
 
     def get_public_profiles(self, page: int = 1, page_size: int = 10) -> List[User]:
-        """Get paginated list of public user profiles"""
-        public_users = [user for user in self.users.values() 
-                       if user.is_public and not user.is_banned and 
-                       not isinstance(user, Admin)]
+        """Get paginated list of public user profiles, best reputation first"""
+        self.reputation.maybe_recompute()
+        public_users = self._rank_by_reputation(
+            [user for user in self.users.values() if self._is_listed(user)]
+        )
         
         start_idx = (page - 1) * page_size
         end_idx = start_idx + page_size
@@ -512,14 +2494,24 @@ class SkillSwapPlatform:
 
     def search_users_by_skill(self, skill: str) -> List[User]:
         """Search users who offer a specific skill"""
-        matching_users = []
-        for user in self.users.values():
-            if (user.is_public and not user.is_banned and 
-                not isinstance(user, Admin) and
-                any(skill.lower() in offered_skill.lower() 
-                    for offered_skill in user.skills_offered)):
-                matching_users.append(user)
-        return matching_users
+        return self._rank_by_reputation([self.users[email] for email in self.skill_index.lookup(skill)
+                                         if self._is_listed(self.users[email])])
+
+    def search_users_nearby(self, location: str, radius_km: float = 50.0,
+                            skill: Optional[str] = None) -> List[Tuple[User, float]]:
+        """Find users within radius_km of a city, optionally offering a skill.
+
+        Returns (user, distance_km) pairs, nearest first.
+        """
+        place = Gazetteer.resolve(location)
+        if place is None:
+            print(f"❌ Unknown location: {location}")
+            return []
+
+        nearby = self.geo_index.query(place[1], place[2], radius_km)
+        skilled = set(self.skill_index.lookup(skill)) if skill else None
+        return [(self.users[email], distance) for email, distance in nearby
+                if (skilled is None or email in skilled) and self._is_listed(self.users[email])]
 
     def search_skills(self, query: str) -> List[str]:
         """Search available technical skills"""
@@ -529,8 +2521,35 @@ class SkillSwapPlatform:
         """Get all skills organized by category"""
         return TechnicalSkills.get_skills_by_category()
 
-    def search_users_by_availability(self, availability: str) -> List[User]:
-        """Search users by availability"""
+    def _is_listed(self, user: User) -> bool:
+        """Check whether a user should appear in directory and search results"""
+        return user.is_public and not user.is_banned and not isinstance(user, Admin)
+
+    def _rank_by_reputation(self, users: List[User]) -> List[User]:
+        """Order users by their last batch-computed reputation score"""
+        return sorted(users, key=lambda user: self.reputation.score(user.email), reverse=True)
+
+    def admin_recompute_reputation(self, full: bool = True) -> int:
+        """Admin function to run a reputation batch immediately"""
+        if not self.is_logged_in() or not isinstance(self.current_user, Admin):
+            print("❌ Admin access required!")
+            return 0
+        rescored = self.reputation.recompute(full=full)
+        print(f"✅ Reputation recomputed for {rescored} users.")
+        return rescored
+
+    def search_users_by_availability(self, availability: str,
+                                     timezone: Optional[str] = None) -> List[User]:
+        """Search users whose availability overlaps the given time description"""
+        if timezone is None:
+            timezone = self.current_user.timezone if self.is_logged_in() else "IST"
+        schedule = AvailabilitySchedule.parse(availability, timezone)
+        if schedule is not None:
+            return self._rank_by_reputation([self.users[email]
+                                             for email in self.availability_index.query(schedule)
+                                             if self._is_listed(self.users[email])])
+
+        # Fall back to a text match for descriptions the parser doesn't understand
         matching_users = []
         for user in self.users.values():
             if (user.is_public and not user.is_banned and 
@@ -539,6 +2558,57 @@ class SkillSwapPlatform:
                 matching_users.append(user)
         return matching_users
 
+    def find_reciprocal_matches(self, email: Optional[str] = None,
+                                require_availability_overlap: bool = False) -> List[User]:
+        """Find users who offer a skill this user wants and want a skill they offer"""
+        if email is None:
+            if not self.is_logged_in():
+                print("❌ Please log in or specify an email!")
+                return []
+            email = self.current_user.email
+        if email not in self.users:
+            print("❌ User not found!")
+            return []
+
+        user = self.users[email]
+        wanted = set(user.skills_wanted)
+        offered = set(user.skills_offered)
+        schedule = self.availability_index.schedules.get(email)
+        overlapping = None
+        if require_availability_overlap:
+            overlapping = set(self.availability_index.query(schedule)) if schedule else set()
+
+        matches = []
+        for other in self.users.values():
+            if other.email == email or not self._is_listed(other):
+                continue
+            if overlapping is not None and other.email not in overlapping:
+                continue
+            if wanted.intersection(other.skills_offered) and offered.intersection(other.skills_wanted):
+                matches.append(other)
+        return matches
+
+    def find_swap_chains(self, email: Optional[str] = None, max_length: int = 4,
+                         limit: int = 10) -> List[SwapChain]:
+        """Find multi-party exchange cycles (3 to max_length users) that include a user"""
+        if email is None:
+            if not self.is_logged_in():
+                print("❌ Please log in or specify an email!")
+                return []
+            email = self.current_user.email
+        return self.swap_chains.find_for_user(email, max_length, limit)
+
+    def admin_propose_swap_chains(self, max_length: int = 4, limit: int = 100) -> List[SwapChain]:
+        """Admin function to propose exchange cycles across the whole platform"""
+        if not self.is_logged_in() or not isinstance(self.current_user, Admin):
+            print("❌ Admin access required!")
+            return []
+        chains = self.swap_chains.propose_all(max_length, limit)
+        print(f"🔗 Found {len(chains)} swap chains")
+        for chain in chains:
+            print(f"   {chain}")
+        return chains
+
     def create_swap_request(self, recipient_email: str, offered_skill: str, 
                            requested_skill: str, message: str) -> bool:
         """Create a new swap request"""
@@ -569,24 +2639,42 @@ class SkillSwapPlatform:
             self.current_user.user_id, recipient.user_id,
             offered_skill, requested_skill, message
         )
-        self.swap_requests.append(swap_request)
+        self._add_swap_request(swap_request)
+        self.event_bus.publish(recipient.user_id, "swap_request.created", {
+            "request_id": swap_request.request_id,
+            "from": self.current_user.email,
+            "offered_skill": offered_skill,
+            "requested_skill": requested_skill,
+        })
         
         print(f"✅ Swap request sent to {recipient.name}!")
         return True
 
     def get_user_requests(self, user_id: str) -> Tuple[List[SwapRequest], List[SwapRequest]]:
         """Get incoming and outgoing requests for a user"""
-        incoming = [req for req in self.swap_requests if req.recipient_id == user_id]
-        outgoing = [req for req in self.swap_requests if req.requester_id == user_id]
+        incoming = list(self._incoming_requests.get(user_id, []))
+        outgoing = list(self._outgoing_requests.get(user_id, []))
         return incoming, outgoing
 
-    def respond_to_request(self, request_id: str, accept: bool) -> bool:
-        """Accept or reject a swap request"""
+    def _print_transition_failure(self, request: SwapRequest, expected_version: Optional[int]):
+        if request.status != RequestStatus.PENDING:
+            print(f"❌ Request is already {request.status.value.lower()}!")
+        else:
+            print(f"❌ Request was modified concurrently (expected version {expected_version}, "
+                  f"now {request.version}). Please refresh and try again.")
+
+    def respond_to_request(self, request_id: str, accept: bool,
+                           expected_version: Optional[int] = None) -> bool:
+        """Accept or reject a swap request.
+
+        If expected_version is given the update only succeeds if nobody else has
+        changed the request since that version was read.
+        """
         if not self.is_logged_in():
             print("❌ You must be logged in!")
             return False
 
-        request = next((req for req in self.swap_requests if req.request_id == request_id), None)
+        request = self._requests_by_id.get(request_id)
         if not request:
             print("❌ Request not found!")
             return False
@@ -596,12 +2684,112 @@ class SkillSwapPlatform:
             return False
 
         new_status = RequestStatus.ACCEPTED if accept else RequestStatus.REJECTED
-        request.update_status(new_status)
+        if not request.update_status(new_status, expected_version):
+            self._print_transition_failure(request, expected_version)
+            return False
+        self._record_response(request, accept)
         
         action = "accepted" if accept else "rejected"
+        self.event_bus.publish(*self._status_notification(
+            request, request.requester_id, self.current_user.email
+        ))
         print(f"✅ Request {action} successfully!")
         return True
 
+    def respond_to_requests(self, decisions: Dict[str, bool],
+                            expected_versions: Optional[Dict[str, int]] = None) -> bool:
+        """Accept or reject several requests atomically: either all apply or none do.
+
+        Only the affected requests are locked, always in request_id order so
+        concurrent batches cannot deadlock.
+        """
+        if not self.is_logged_in():
+            print("❌ You must be logged in!")
+            return False
+
+        if not decisions:
+            print("❌ No requests selected!")
+            return False
+
+        expected_versions = expected_versions or {}
+        requests = []
+        for request_id in sorted(decisions):
+            request = self._requests_by_id.get(request_id)
+            if not request:
+                print(f"❌ Request not found: {request_id}")
+                return False
+            if request.recipient_id != self.current_user.user_id:
+                print("❌ You can only respond to requests sent to you!")
+                return False
+            requests.append(request)
+
+        with ExitStack() as locks:
+            for request in requests:
+                locks.enter_context(request._lock)
+            for request in requests:
+                new_status = RequestStatus.ACCEPTED if decisions[request.request_id] else RequestStatus.REJECTED
+                expected_version = expected_versions.get(request.request_id)
+                if not request.can_transition(new_status, expected_version):
+                    self._print_transition_failure(request, expected_version)
+                    print("❌ No requests were updated.")
+                    return False
+            for request in requests:
+                request._apply_status(
+                    RequestStatus.ACCEPTED if decisions[request.request_id] else RequestStatus.REJECTED
+                )
+
+        with self._batched_changes():
+            for request in requests:
+                self._record_response(request, decisions[request.request_id])
+        self.event_bus.publish_many([
+            self._status_notification(request, request.requester_id, self.current_user.email)
+            for request in requests
+        ])
+        accepted = sum(1 for request in requests if decisions[request.request_id])
+        print(f"✅ {accepted} requests accepted, {len(requests) - accepted} rejected.")
+        return True
+
+    def cancel_request(self, request_id: str) -> bool:
+        """Withdraw a pending request you sent"""
+        if not self.is_logged_in():
+            print("❌ You must be logged in!")
+            return False
+
+        request = self._requests_by_id.get(request_id)
+        if not request:
+            print("❌ Request not found!")
+            return False
+
+        if request.requester_id != self.current_user.user_id:
+            print("❌ You can only cancel requests you sent!")
+            return False
+
+        if not request.update_status(RequestStatus.CANCELLED):
+            self._print_transition_failure(request, None)
+            return False
+        self._on_request_status_change(request, RequestStatus.PENDING)
+        self.event_bus.publish(*self._status_notification(
+            request, request.recipient_id, self.current_user.email
+        ))
+        print("✅ Request cancelled.")
+        return True
+
+    def expire_stale_requests(self, max_age_days: int = 30) -> int:
+        """Expire pending requests older than max_age_days; returns how many expired"""
+        cutoff = datetime.datetime.now() - datetime.timedelta(days=max_age_days)
+        expired = []
+        with self._batched_changes():
+            for request in self.swap_requests:
+                if (request.status == RequestStatus.PENDING and request.created_at < cutoff
+                        and request.update_status(RequestStatus.EXPIRED)):
+                    self._on_request_status_change(request, RequestStatus.PENDING)
+                    expired.append(request)
+        self.event_bus.publish_many([
+            self._status_notification(request, request.requester_id, "system")
+            for request in expired
+        ])
+        return len(expired)
+
     def leave_feedback(self, target_email: str, rating: int, comment: str) -> bool:
         """Leave feedback for another user"""
         if not self.is_logged_in():
@@ -622,6 +2810,39 @@ class SkillSwapPlatform:
         print(f"✅ Feedback left for {target_user.name}!")
         return True
 
+    def get_feedback_page(self, email: str, cursor: Optional[int] = None,
+                          page_size: int = 10) -> Tuple[List[Feedback], Optional[int]]:
+        """Get one page of a user's reviews, newest first, plus the next page cursor"""
+        return self.feedback_store.page(email, cursor, page_size)
+
+    def get_feedback_by_reviewer(self, email: str) -> List[Tuple[str, Feedback]]:
+        """Admin lookup of every review a user has left, for abuse detection"""
+        if not self.is_logged_in() or not isinstance(self.current_user, Admin):
+            print("❌ Admin access required!")
+            return []
+        return self.feedback_store.by_reviewer(email)
+
+    def get_notifications(self, max_events: int = 50) -> List[Event]:
+        """Fetch pending notifications for the current user"""
+        if not self.is_logged_in():
+            print("❌ Please log in first!")
+            return []
+        return self.event_bus.poll(self.current_user.user_id, max_events)
+
+    def display_notifications(self, max_events: int = 50):
+        """Display pending notifications for the current user"""
+        if not self.is_logged_in():
+            print("❌ Please log in first!")
+            return
+
+        events = self.get_notifications(max_events)
+        print(f"\n🔔 NOTIFICATIONS ({len(events)})")
+        print("="*50)
+        if not events:
+            print("   No new notifications.")
+        for event in events:
+            print(f"   {event}")
+
     def display_skills_catalog(self):
         """Display comprehensive technical skills catalog"""
         print("\n" + "="*80)
@@ -648,35 +2869,51 @@ class SkillSwapPlatform:
         print("🏠 SKILL SWAP PLATFORM - HOME PAGE")
         print("="*80)
         
-        public_profiles = self.get_public_profiles()
+        self.reputation.maybe_recompute()
+        cards = self.profile_cache.get_or_render(
+            ("home", self.HOME_PAGE_CACHE_OWNER, 1, 10,
+             self._directory_version, self.reputation.version),
+            lambda: [(user.email, self._render_home_card(user))
+                     for user in self.get_public_profiles()]
+        )
         
-        if not public_profiles:
+        if not cards:
             print("No public profiles available.")
             return
 
-        for user in public_profiles:
-            print(f"\n📋 {user.name}")
-            if user.location:
-                print(f"   📍 Location: {user.location}")
-            print(f"   ⭐ Rating: {user.get_average_rating():.1f}/5.0 ({len(user.feedback)} reviews)")
-            
-            # Display skills in a more organized way
-            offered_skills = user.skills_offered[:5]  # Show first 5
-            wanted_skills = user.skills_wanted[:5]    # Show first 5
+        for email, card in cards:
+            print(card)
+            if self.is_logged_in() and email != self.current_user.email:
+                print(f"   ➡️  Send request: contact {email}")
+            print("-" * 60)
+
+    def _render_home_card(self, user: User) -> str:
+        """Render a user's home page card, reusing the cached copy if current"""
+        return self.profile_cache.get_or_render(
+            ("card", user.email, user.version),
+            lambda: self._format_home_card(user)
+        )
+
+    def _format_home_card(self, user: User) -> str:
+        lines = [f"\n📋 {user.name}"]
+        if user.location:
+            lines.append(f"   📍 Location: {user.location}")
+        lines.append(f"   ⭐ Rating: {user.get_average_rating():.1f}/5.0 ({user.get_feedback_count()} reviews)")
+        
+        # Display skills in a more organized way
+        offered_skills = user.skills_offered[:5]  # Show first 5
+        wanted_skills = user.skills_wanted[:5]    # Show first 5
+        
+        lines.append(f"   💡 Offers: {', '.join(offered_skills)}")
+        if len(user.skills_offered) > 5:
+            lines.append(f"      ... and {len(user.skills_offered) - 5} more")
             
-            print(f"   💡 Offers: {', '.join(offered_skills)}")
-            if len(user.skills_offered) > 5:
-                print(f"      ... and {len(user.skills_offered) - 5} more")
-                
-            print(f"   🎯 Wants: {', '.join(wanted_skills)}")
-            if len(user.skills_wanted) > 5:
-                print(f"      ... and {len(user.skills_wanted) - 5} more")
-                
-            print(f"   ⏰ Available: {user.availability}")
+        lines.append(f"   🎯 Wants: {', '.join(wanted_skills)}")
+        if len(user.skills_wanted) > 5:
+            lines.append(f"      ... and {len(user.skills_wanted) - 5} more")
             
-            if self.is_logged_in() and user.email != self.current_user.email:
-                print(f"   ➡️  Send request: contact {user.email}")
-            print("-" * 60)
+        lines.append(f"   ⏰ Available: {user.availability}")
+        return "\n".join(lines)
 
     def display_user_profile(self, email: str = None):
         """Display user profile"""
@@ -691,34 +2928,40 @@ class SkillSwapPlatform:
                 return
             user = self.users[email]
 
-        print(f"\n👤 PROFILE: {user.name}")
-        print("="*50)
-        print(f"Email: {user.email}")
+        print(self.profile_cache.get_or_render(
+            ("profile", user.email, user.version),
+            lambda: self._format_user_profile(user)
+        ))
+
+    def _format_user_profile(self, user: User) -> str:
+        lines = [f"\n👤 PROFILE: {user.name}", "="*50, f"Email: {user.email}"]
         if user.location:
-            print(f"Location: {user.location}")
-        print(f"Profile: {'Public' if user.is_public else 'Private'}")
+            lines.append(f"Location: {user.location}")
+        lines.append(f"Profile: {'Public' if user.is_public else 'Private'}")
         
-        print(f"\n💡 SKILLS OFFERED ({len(user.skills_offered)}):")
+        lines.append(f"\n💡 SKILLS OFFERED ({len(user.skills_offered)}):")
         if user.skills_offered:
             for i, skill in enumerate(user.skills_offered, 1):
-                print(f"   {i}. {skill}")
+                lines.append(f"   {i}. {skill}")
         else:
-            print("   None specified")
+            lines.append("   None specified")
             
-        print(f"\n🎯 SKILLS WANTED ({len(user.skills_wanted)}):")
+        lines.append(f"\n🎯 SKILLS WANTED ({len(user.skills_wanted)}):")
         if user.skills_wanted:
             for i, skill in enumerate(user.skills_wanted, 1):
-                print(f"   {i}. {skill}")
+                lines.append(f"   {i}. {skill}")
         else:
-            print("   None specified")
+            lines.append("   None specified")
             
-        print(f"\n⏰ Availability: {user.availability if user.availability else 'Not specified'}")
-        print(f"⭐ Rating: {user.get_average_rating():.1f}/5.0 ({len(user.feedback)} reviews)")
+        lines.append(f"\n⏰ Availability: {user.availability if user.availability else 'Not specified'}")
+        lines.append(f"⭐ Rating: {user.get_average_rating():.1f}/5.0 ({user.get_feedback_count()} reviews)")
         
-        if user.feedback:
-            print("\n💬 Recent Feedback:")
-            for feedback in user.feedback[-3:]:  # Show last 3 reviews
-                print(f"   ⭐ {feedback.rating}/5 - {feedback.comment}")
+        recent_feedback = self.feedback_store.latest(user.email, 3)  # Show last 3 reviews
+        if recent_feedback:
+            lines.append("\n💬 Recent Feedback:")
+            for feedback in recent_feedback:
+                lines.append(f"   ⭐ {feedback.rating}/5 - {feedback.comment}")
+        return "\n".join(lines)
 
     def display_swap_requests(self):
         """Display user's swap requests"""
@@ -736,7 +2979,7 @@ class SkillSwapPlatform:
             print("   No incoming requests.")
         else:
             for req in incoming:
-                requester = next((u for u in self.users.values() if u.user_id == req.requester_id), None)
+                requester = self._users_by_id.get(req.requester_id)
                 if requester:
                     print(f"   From: {requester.name}")
                     print(f"   Offering: {req.offered_skill} → Wants: {req.requested_skill}")
@@ -750,7 +2993,7 @@ class SkillSwapPlatform:
             print("   No outgoing requests.")
         else:
             for req in outgoing:
-                recipient = next((u for u in self.users.values() if u.user_id == req.recipient_id), None)
+                recipient = self._users_by_id.get(req.recipient_id)
                 if recipient:
                     print(f"   To: {recipient.name}")
                     print(f"   Offering: {req.offered_skill} → Wants: {req.requested_skill}")
@@ -769,8 +3012,8 @@ class SkillSwapPlatform:
         print("="*70)
         
         for req in self.swap_requests:
-            requester = next((u for u in self.users.values() if u.user_id == req.requester_id), None)
-            recipient = next((u for u in self.users.values() if u.user_id == req.recipient_id), None)
+            requester = self._users_by_id.get(req.requester_id)
+            recipient = self._users_by_id.get(req.recipient_id)
             
             if requester and recipient:
                 print(f"Request ID: {req.request_id}")
@@ -792,9 +3035,145 @@ class SkillSwapPlatform:
             return
 
         user = self.users[email]
-        user.is_banned = True
+        user.update_profile(is_banned=True)
         print(f"✅ User {user.name} has been banned.")
 
+    def _select_users(self, emails: Optional[List[str]],
+                      predicate: Optional[Callable[[User], bool]],
+                      all_users: bool = False) -> Tuple[List[User], List[str]]:
+        """Resolve a batch target to non-admin users; returns (users, unknown_emails).
+
+        Exactly one of emails, predicate or all_users must be given, so an
+        empty call can never select the whole user base by accident.
+        """
+        if sum((emails is not None, predicate is not None, all_users)) != 1:
+            raise ValueError("Specify exactly one of emails, predicate or all_users=True")
+        if emails is None:
+            candidates = list(self.users.values())
+            missing = []
+        else:
+            candidates = [self.users[email] for email in dict.fromkeys(emails) if email in self.users]
+            missing = [email for email in emails if email not in self.users]
+        selected = [user for user in candidates
+                    if not isinstance(user, Admin) and (predicate is None or predicate(user))]
+        return selected, missing
+
+    def _reject_pending_for(self, users: List[User]) -> int:
+        """Reject every pending request sent by or to the given users, notifying once per batch.
+
+        The notice goes to the other participant, so the innocent side of a
+        spam request hears about it rather than the user being moderated.
+        """
+        selected_ids = {user.user_id for user in users}
+        notifications = []
+        rejected = 0
+        for user in users:
+            for request in (self._outgoing_requests.get(user.user_id, []) +
+                            self._incoming_requests.get(user.user_id, [])):
+                if not request.update_status(RequestStatus.REJECTED):
+                    continue  # No longer pending, possibly answered concurrently
+                self._on_request_status_change(request, RequestStatus.PENDING)
+                rejected += 1
+                for participant_id in (request.requester_id, request.recipient_id):
+                    if participant_id not in selected_ids:
+                        notifications.append(self._status_notification(
+                            request, participant_id, self.current_user.email
+                        ))
+        self.event_bus.publish_many(notifications)
+        return rejected
+
+    def _admin_batch_update(self, action: str, emails: Optional[List[str]],
+                            predicate: Optional[Callable[[User], bool]], all_users: bool,
+                            ban: Optional[bool], reject_pending: bool) -> Dict[str, Any]:
+        if not self.is_logged_in() or not isinstance(self.current_user, Admin):
+            print("❌ Admin access required!")
+            return {}
+
+        users, missing = self._select_users(emails, predicate, all_users)
+        updated = 0
+        with self._batched_changes():
+            if ban is not None:
+                for user in users:
+                    if user.is_banned != ban:
+                        user.update_profile(is_banned=ban)
+                        updated += 1
+            rejected = self._reject_pending_for(users) if reject_pending else 0
+
+        summary = {
+            "action": action,
+            "matched": len(users),
+            "updated": updated,
+            "requests_rejected": rejected,
+            "not_found": missing,
+        }
+        print(f"✅ Batch {action}: {len(users)} users matched, {updated} updated, "
+              f"{rejected} pending requests rejected"
+              + (f", {len(missing)} emails not found" if missing else ""))
+        return summary
+
+    def admin_batch_ban(self, emails: Optional[List[str]] = None,
+                        predicate: Optional[Callable[[User], bool]] = None,
+                        reject_pending: bool = True, all_users: bool = False) -> Dict[str, Any]:
+        """Admin function to ban listed or predicate-selected users in one pass"""
+        return self._admin_batch_update("ban", emails, predicate, all_users, True, reject_pending)
+
+    def admin_batch_unban(self, emails: Optional[List[str]] = None,
+                          predicate: Optional[Callable[[User], bool]] = None,
+                          all_users: bool = False) -> Dict[str, Any]:
+        """Admin function to lift bans on listed or predicate-selected users"""
+        return self._admin_batch_update("unban", emails, predicate, all_users, False, False)
+
+    def admin_batch_reject_pending(self, emails: Optional[List[str]] = None,
+                                   predicate: Optional[Callable[[User], bool]] = None,
+                                   all_users: bool = False) -> Dict[str, Any]:
+        """Admin function to reject all pending requests involving the selected users"""
+        return self._admin_batch_update("reject-pending", emails, predicate, all_users, None, True)
+
+    def admin_generate_analytics(self):
+        """Admin function to print cohort and skill supply/demand analytics"""
+        if not self.is_logged_in() or not isinstance(self.current_user, Admin):
+            print("❌ Admin access required!")
+            return
+
+        table = self.get_columnar_table()
+        if table is None:
+            return
+
+        stats = table.cohort_stats()
+        print(f"\n📈 PLATFORM ANALYTICS ({len(table)} rows)")
+        print("="*50)
+        print(f"Users: {stats['users']} ({stats['public']} public, {stats['banned']} banned)")
+        print(f"Reviews: {stats['reviews']} (mean rating {stats['mean_rating']:.2f})")
+        print(f"Average Skills Offered: {stats['mean_skills_offered']:.1f}")
+
+        print(f"\n📂 SUPPLY VS DEMAND BY CATEGORY:")
+        for category, supply, demand in table.category_gaps():
+            print(f"   {category:<28} offered by {supply:>4} | wanted by {demand:>4}")
+
+        print(f"\n⚠️  MOST UNDER-SUPPLIED SKILLS:")
+        for skill, supply, demand in table.skill_gaps(5):
+            print(f"   {skill}: wanted by {demand}, offered by {supply}")
+
+    def admin_skill_gap_report(self, window: str = "week", category: Optional[str] = None,
+                               top: int = 10):
+        """Admin function to show the most under-supplied skills and categories"""
+        if not self.is_logged_in() or not isinstance(self.current_user, Admin):
+            print("❌ Admin access required!")
+            return
+
+        print(f"\n⚖️  SKILL SUPPLY/DEMAND GAPS (last {window})")
+        print("="*70)
+        if category is None:
+            print("\n📂 BY CATEGORY:")
+            for row in self.skill_demand.category_report(window):
+                print(f"   {row['category']:<28} supply {row['supply']:>4} | demand {row['demand']:>4}"
+                      f" | requested {row['requested']:>3} | accepted {row['accepted']:>3}")
+
+        print(f"\n🎯 MOST UNDER-SUPPLIED SKILLS{f' IN {category.upper()}' if category else ''}:")
+        for row in [row for row in self.skill_demand.skill_report(window, category) if row["demand"]][:top]:
+            print(f"   {row['skill']:<28} supply {row['supply']:>4} | demand {row['demand']:>4}"
+                  f" | ratio {row['ratio']:.2f} | requested {row['requested']:>3}")
+
     def admin_send_announcement(self, message: str):
         """Admin function to send global announcement"""
         if not self.is_logged_in() or not isinstance(self.current_user, Admin):
@@ -802,6 +3181,7 @@ class SkillSwapPlatform:
             return
 
         self.global_announcements.append(f"[{datetime.datetime.now().strftime('%Y-%m-%d %H:%M')}] {message}")
+        self.event_bus.broadcast("announcement", {"message": message, "from": self.current_user.email})
         print(f"📢 GLOBAL ANNOUNCEMENT: {message}")
 
     def admin_generate_report(self):
@@ -810,17 +3190,21 @@ class SkillSwapPlatform:
             print("❌ Admin access required!")
             return
 
-        total_users = len([u for u in self.users.values() if not isinstance(u, Admin)])
-        banned_users = len([u for u in self.users.values() if u.is_banned])
-        total_requests = len(self.swap_requests)
-        accepted_requests = len([r for r in self.swap_requests if r.status == RequestStatus.ACCEPTED])
-        pending_requests = len([r for r in self.swap_requests if r.status == RequestStatus.PENDING])
+        # Read from a snapshot so the scan is consistent while writes continue
+        snapshot = self.snapshot()
+        users = list(snapshot.users())
+        requests = list(snapshot.requests())
+        total_users = len([u for u in users if not u.is_admin])
+        banned_users = len([u for u in users if u.is_banned])
+        total_requests = len(requests)
+        accepted_requests = len([r for r in requests if r.status == RequestStatus.ACCEPTED])
+        pending_requests = len([r for r in requests if r.status == RequestStatus.PENDING])
         
         # Skills analytics
         all_offered_skills = []
         all_wanted_skills = []
-        for user in self.users.values():
-            if not isinstance(user, Admin):
+        for user in users:
+            if not user.is_admin:
                 all_offered_skills.extend(user.skills_offered)
                 all_wanted_skills.extend(user.skills_wanted)
         
@@ -835,8 +3219,11 @@ class SkillSwapPlatform:
         print(f"Total Swap Requests: {total_requests}")
         print(f"Accepted Requests: {accepted_requests}")
         print(f"Pending Requests: {pending_requests}")
-        print(f"Total Feedback Reviews: {sum(len(u.feedback) for u in self.users.values())}")
+        print(f"Total Feedback Reviews: {snapshot.feedback_count}")
         print(f"Available Technical Skills: {len(self.all_technical_skills)}")
+        cache_stats = self.profile_cache.stats()
+        print(f"Profile Cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+              f"({cache_stats['hit_rate']:.0%} hit rate, {cache_stats['size']} entries)")
         
         print(f"\n🔥 TOP 5 MOST OFFERED SKILLS:")
         for skill, count in top_offered:
@@ -902,6 +3289,9 @@ def demonstrate_comprehensive_platform():
     platform.logout()
     platform.login("yashpal@skillwise.in", "password123")
     
+    print("\n🔔 Yashpal checking notifications:")
+    platform.display_notifications()
+    
     # View Yashpal's profile
     print("\n🔟 Viewing Yashpal's technical profile:")
     platform.display_user_profile()
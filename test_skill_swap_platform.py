@@ -0,0 +1,323 @@
+import itertools
+import os
+import random
+import tempfile
+import time
+import unittest
+
+from skill_swap_platform import (AvailabilitySchedule, ChangeLog, ColumnarUserTable, FileChangeLog, GeoIndex, RequestStatus,
+                                 SkillDemandTracker, SkillSwapPlatform, SwapChainFinder, haversine_km, np)
+
+
+def brute_force_cycles(offered, wanted, max_length):
+    """Every cycle of length 3..max_length, rotated to start at its lowest node"""
+    nodes = sorted(offered)
+    cycles = set()
+    for length in range(3, max_length + 1):
+        for cycle in itertools.permutations(nodes, length):
+            if cycle[0] != min(cycle):
+                continue
+            if all(wanted[cycle[i]] & offered[cycle[(i + 1) % length]] for i in range(length)):
+                cycles.add(cycle)
+    return cycles
+
+
+def canonical(cycle):
+    start = cycle.index(min(cycle))
+    return tuple(cycle[start:] + cycle[:start])
+
+
+class SwapChainFinderTest(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(1)
+        skills = "abcdefghijkl"
+        self.offered = {n: set(rng.sample(skills, 2)) for n in range(20)}
+        self.wanted = {n: set(rng.sample(skills, 2)) for n in range(20)}
+        self.finder = SwapChainFinder()
+        for node in sorted(self.offered):
+            self.finder.update(str(node), sorted(self.offered[node]), sorted(self.wanted[node]))
+
+    def found(self, chains):
+        return {tuple(int(email) for email in chain.participants) for chain in chains}
+
+    def assert_valid_skills(self, chains):
+        for chain in chains:
+            for i, skill in enumerate(chain.skills):
+                learner = int(chain.participants[i])
+                teacher = int(chain.participants[(i + 1) % len(chain)])
+                self.assertIn(skill, self.wanted[learner] & self.offered[teacher])
+
+    def test_propose_all_matches_brute_force(self):
+        for max_length in (3, 4, 5):
+            chains = self.finder.propose_all(max_length=max_length, limit=10 ** 9)
+            self.assertEqual(self.found(chains),
+                             brute_force_cycles(self.offered, self.wanted, max_length))
+            self.assertEqual(len(chains), len(self.found(chains)))
+            self.assert_valid_skills(chains)
+
+    def test_find_for_user_matches_brute_force(self):
+        expected = brute_force_cycles(self.offered, self.wanted, 4)
+        for node in (0, 7, 13):
+            chains = self.finder.find_for_user(str(node), max_length=4, limit=10 ** 9)
+            found = {canonical(list(cycle)) for cycle in self.found(chains)}
+            self.assertEqual(found, {cycle for cycle in expected if node in cycle})
+            self.assertTrue(all(chain.participants[0] == str(node) for chain in chains))
+
+    def test_incremental_updates_match_brute_force(self):
+        rng = random.Random(2)
+        for node in rng.sample(sorted(self.offered), 8):
+            self.offered[node] = set(rng.sample("abcdefghijkl", 2))
+            self.wanted[node] = set(rng.sample("abcdefghijkl", 2))
+            self.finder.update(str(node), sorted(self.offered[node]), sorted(self.wanted[node]))
+        for node in (3, 11):
+            self.finder.update(str(node), [], [], active=False)
+            del self.offered[node], self.wanted[node]
+        chains = self.finder.propose_all(max_length=4, limit=10 ** 9)
+        self.assertEqual(self.found(chains), brute_force_cycles(self.offered, self.wanted, 4))
+
+    def test_large_population_stops_at_limit_shortest_first(self):
+        rng = random.Random(5)
+        skills = [f"skill{i}" for i in range(400)]
+        weights = [1 / (rank + 1) for rank in range(len(skills))]  # A few skills are very popular
+        profiles = {}
+        finder = SwapChainFinder()
+        for node in range(20000):
+            offered, wanted = rng.choices(skills, weights, k=3), rng.choices(skills, weights, k=3)
+            profiles[str(node)] = (set(offered), set(wanted))
+            finder.update(str(node), offered, wanted)
+
+        started = time.perf_counter()
+        chains = [finder.find_for_user(str(node), max_length=4, limit=10) for node in range(0, 20000, 1000)]
+        chains.append(finder.propose_all(max_length=4, limit=100))
+        self.assertLess(time.perf_counter() - started, 5.0)
+
+        self.assertEqual(len(chains[-1]), 100)
+        for batch in chains:
+            self.assertEqual([len(chain) for chain in batch], sorted(len(chain) for chain in batch))
+            for chain in batch:
+                self.assertEqual(len(set(chain.participants)), len(chain))
+                for i, skill in enumerate(chain.skills):
+                    learner = profiles[chain.participants[i]]
+                    teacher = profiles[chain.participants[(i + 1) % len(chain)]]
+                    self.assertIn(skill, learner[1] & teacher[0])
+
+
+class RespondToRequestsTest(unittest.TestCase):
+    def setUp(self):
+        self.platform = SkillSwapPlatform(seed_sample_data=False)
+        for name in ("alice", "bob", "carol"):
+            self.platform.register_user(name.title(), f"{name}@example.com", "secret")
+            self.platform.users[f"{name}@example.com"].update_profile(skills_offered=[name])
+        self.requests = []
+        for requester in ("bob", "carol"):
+            self.platform.login(f"{requester}@example.com", "secret")
+            self.platform.create_swap_request("alice@example.com", requester, "alice", "hi")
+            self.requests.append(self.platform.swap_requests[-1])
+        self.platform.login("alice@example.com", "secret")
+
+    def assert_untouched(self, versions):
+        for request in self.requests:
+            self.assertEqual(request.status, RequestStatus.PENDING)
+            self.assertEqual(request.version, versions[request.request_id])
+
+    def test_stale_version_rolls_back_whole_batch(self):
+        valid, stale = self.requests
+        versions = {request.request_id: request.version for request in self.requests}
+        decisions = {valid.request_id: True, stale.request_id: False}
+        expected = {valid.request_id: valid.version, stale.request_id: stale.version + 1}
+
+        self.assertFalse(self.platform.respond_to_requests(decisions, expected))
+        self.assert_untouched(versions)
+
+    def test_already_answered_request_rolls_back_whole_batch(self):
+        valid, answered = self.requests
+        self.assertTrue(self.platform.respond_to_request(answered.request_id, False))
+        valid_version = valid.version
+
+        decisions = {valid.request_id: True, answered.request_id: True}
+        self.assertFalse(self.platform.respond_to_requests(decisions))
+        self.assertEqual(valid.status, RequestStatus.PENDING)
+        self.assertEqual(valid.version, valid_version)
+        self.assertEqual(answered.status, RequestStatus.REJECTED)
+
+    def test_valid_batch_applies_every_decision(self):
+        first, second = self.requests
+        decisions = {first.request_id: True, second.request_id: False}
+        expected = {request.request_id: request.version for request in self.requests}
+
+        self.assertTrue(self.platform.respond_to_requests(decisions, expected))
+        self.assertEqual(first.status, RequestStatus.ACCEPTED)
+        self.assertEqual(second.status, RequestStatus.REJECTED)
+
+    def test_empty_batch_is_rejected(self):
+        self.assertFalse(self.platform.respond_to_requests({}))
+
+
+class SkillDemandTrackerTest(unittest.TestCase):
+    def activity(self, tracker, skill):
+        return next(row for row in tracker.skill_report("hour") if row["skill"] == skill)
+
+    def test_unban_restores_supply_without_new_activity(self):
+        tracker = SkillDemandTracker()
+        tracker.update_user("a@example.com", ["Python"], ["Go"])
+        tracker.update_user("a@example.com", ["Python"], ["Go"], active=False)
+        self.assertEqual(self.activity(tracker, "Python")["supply"], 0)
+
+        tracker.update_user("a@example.com", ["Python"], ["Go"])
+        row = self.activity(tracker, "Python")
+        self.assertEqual((row["supply"], row["offered"]), (1, 1))
+        self.assertEqual(self.activity(tracker, "Go")["wanted"], 1)
+
+    def test_profile_edit_records_activity(self):
+        tracker = SkillDemandTracker()
+        tracker.update_user("a@example.com", ["Python"], [])
+        tracker.update_user("a@example.com", ["Python", "Rust"], [])
+        self.assertEqual(self.activity(tracker, "Rust")["offered"], 1)
+        self.assertEqual(self.activity(tracker, "Python")["offered"], 1)
+
+
+class GeoIndexTest(unittest.TestCase):
+    def test_query_wraps_at_antimeridian(self):
+        index = GeoIndex()
+        index.update("fiji@example.com", (-17.0, 179.9))
+        self.assertEqual([email for email, _ in index.query(-17.0, -179.9, 50)], ["fiji@example.com"])
+
+    def test_huge_radius_returns_everyone(self):
+        index = GeoIndex()
+        for i in range(7):
+            index.update(f"{i}@example.com", (i * 10.0, i * 20.0))
+        self.assertEqual(len(index.query(0.0, 0.0, 200000)), 7)
+
+    def test_query_matches_brute_force(self):
+        rng = random.Random(3)
+        for cell_degrees in (0.5, 0.7, 30.0):
+            index = GeoIndex(cell_degrees)
+            points = {}
+            for i in range(300):
+                latitude = rng.choice([rng.uniform(-90, 90), rng.uniform(80, 90)])
+                longitude = rng.choice([rng.uniform(-180, 180), rng.uniform(178, 180)])
+                points[str(i)] = (latitude, longitude)
+                index.update(str(i), (latitude, longitude))
+            for _ in range(300):
+                latitude = rng.choice([rng.uniform(-90, 90), rng.uniform(75, 90)])
+                longitude = rng.choice([rng.uniform(-180, 180), -179.9])
+                radius = rng.choice([10, 500, 3000, 25000])
+                expected = {email for email, point in points.items()
+                            if haversine_km(latitude, longitude, *point) <= radius}
+                found = {email for email, _ in index.query(latitude, longitude, radius)}
+                self.assertEqual(found, expected)
+
+
+class FileChangeLogTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "changes.jsonl")
+        log = FileChangeLog(self.path)
+        for i in range(4):
+            log.append("user", f"{i}@example.com", "create", {"name": (None, str(i))})
+
+    def test_torn_tail_is_truncated_on_reopen(self):
+        with open(self.path, "ab") as log_file:
+            log_file.write(b'{"sequence": 5, "entity": "us')
+        log = FileChangeLog(self.path)
+        self.assertEqual(log.last_sequence, 4)
+        self.assertEqual(log.append("user", "5@example.com", "create", {}), 5)
+        self.assertEqual([record.sequence for record in FileChangeLog(self.path).read()], [1, 2, 3, 4, 5])
+
+    def test_corrupt_line_is_skipped_but_keeps_its_sequence(self):
+        with open(self.path, "rb") as log_file:
+            lines = log_file.readlines()
+        lines[1] = b"not json\n"
+        with open(self.path, "wb") as log_file:
+            log_file.writelines(lines)
+        log = FileChangeLog(self.path)
+        self.assertEqual(log.last_sequence, 4)
+        self.assertEqual([record.sequence for record in log.read()], [1, 3, 4])
+        self.assertEqual([record.sequence for record in log.read(1, 2)], [3])
+
+    def test_platform_seeds_sample_data_unless_told_not_to(self):
+        self.assertTrue(SkillSwapPlatform(change_log=ChangeLog()).users)
+        self.assertFalse(SkillSwapPlatform(change_log=FileChangeLog(self.path), seed_sample_data=False).users)
+
+
+@unittest.skipIf(np is None, "NumPy not installed")
+class ColumnarUserTableTest(unittest.TestCase):
+    def rows(self, table):
+        """Each user's row as plain values, keyed by email, so row order doesn't matter"""
+        result = {}
+        for email, row in table._rows.items():
+            values = [getattr(table, column)[row].item() for column, _ in ColumnarUserTable._SCALAR_COLUMNS]
+            for kind in ("offered", "wanted"):
+                ids = getattr(table, f"{kind}_skill_ids")
+                offsets = getattr(table, f"{kind}_offsets")
+                values.append([table.skill_names[i] for i in ids[offsets[row]:offsets[row + 1]]])
+            result[email] = values
+        return result
+
+    def test_patched_table_matches_fresh_build(self):
+        rng = random.Random(4)
+        platform = SkillSwapPlatform()
+        skills = platform.all_technical_skills
+        table = platform.get_columnar_table()
+        for round_number in range(20):
+            platform.register_user("New", f"new{round_number}@example.com", "secret")
+            for user in rng.sample(list(platform.users.values()), 3):
+                user.update_profile(skills_offered=rng.sample(skills, rng.randint(0, 4)),
+                                    is_banned=rng.random() < 0.3)
+            rng.choice(list(platform.users.values())).add_feedback("x@example.com", rng.randint(1, 5), "")
+
+            self.assertIs(platform.get_columnar_table(), table)
+            fresh = ColumnarUserTable(platform.snapshot())
+            self.assertEqual(self.rows(table), self.rows(fresh))
+            # Ties are ordered by skill id, which depends on the order skills were first seen
+            self.assertEqual(sorted(table.skill_gaps(top=len(skills))), sorted(fresh.skill_gaps(top=len(skills))))
+            stats, fresh_stats = table.cohort_stats(), fresh.cohort_stats()
+            self.assertAlmostEqual(stats.pop("mean_rating"), fresh_stats.pop("mean_rating"), places=5)
+            self.assertEqual(stats, fresh_stats)
+
+
+class AvailabilityParseTest(unittest.TestCase):
+    def hours(self, text):
+        """Free hours per weekday, parsed in UTC so slots map straight to local time"""
+        schedule = AvailabilitySchedule.parse(text, "UTC")
+        if schedule is None:
+            return None
+        result = {}
+        for slot in schedule.slots():
+            result.setdefault(slot // 48, set()).add(slot % 48 / 2)
+        return {day: (min(halves), max(halves) + 0.5) for day, halves in result.items()}
+
+    def assert_hours(self, text, days, start, end):
+        self.assertEqual(self.hours(text), {day: (start, end) for day in days}, text)
+
+    def test_bare_range_is_business_hours(self):
+        self.assert_hours("Weekdays 9-5", range(5), 9, 17)
+        self.assert_hours("Mon 9am-5", [0], 9, 17)
+
+    def test_period_makes_bare_hours_pm(self):
+        self.assert_hours("Evenings 6 to 9", range(7), 18, 21)
+        self.assert_hours("Evenings 6-12", range(7), 18, 24)
+        self.assert_hours("Afternoons 12-3", range(7), 12, 15)
+        self.assert_hours("Evenings after 6", range(7), 18, 24)
+
+    def test_start_inherits_meridiem_only_when_it_stays_earlier(self):
+        self.assert_hours("Tuesday 7-9pm", [1], 19, 21)
+        self.assert_hours("Mon-Fri 10-2pm", range(5), 10, 14)
+
+    def test_day_ranges_expand_and_wrap(self):
+        self.assert_hours("Mon-Wed", range(3), 0, 24)
+        self.assert_hours("Fri to Mon", [4, 5, 6, 0], 0, 24)
+
+    def test_bounds_and_ranges_past_midnight(self):
+        self.assert_hours("Weekdays after 6pm", range(5), 18, 24)
+        self.assert_hours("Sat before 11am", [5], 0, 11)
+        self.assertEqual(self.hours("Sat 22-2"), {5: (22, 24), 6: (0, 2)})
+
+    def test_unreadable_time_clause_is_skipped(self):
+        self.assertIsNone(self.hours("Weekends around 5ish"))
+        self.assert_hours("Weekends around 5ish; Mon 9-5", [0], 9, 17)
+
+
+if __name__ == "__main__":
+    unittest.main()